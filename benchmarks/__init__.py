@@ -0,0 +1 @@
+"""Benchmarks of pykeyatome, not shipped with the package."""
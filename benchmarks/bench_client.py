@@ -0,0 +1,137 @@
+"""Benchmark the sync client against the local stand-in server.
+
+The server runs in a subprocess so that the CPU time measured here is the
+client's only. For each concurrency level, one logged-in AtomeClient per
+worker thread calls the endpoint in a loop; requests/sec, p50/p99 latency and
+client CPU per call are reported.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_client [--calls N] [--concurrency 1 4 16]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from pykeyatome.client import AtomeClient
+
+USER_ID = "12345"
+USER_REFERENCE = "101234567"
+
+
+def start_server(*server_args):
+    """Start the stand-in server in a subprocess, return (process, base url)."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.server"] + list(server_args),
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    return process, process.stdout.readline().strip()
+
+
+def percentile(values, fraction):
+    """Get a percentile of sorted values."""
+    if not values:
+        return float("nan")
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def run_level(base_uri, endpoint, concurrency, calls, client_kwargs=None):
+    """Run calls per worker on concurrency workers, return the measures."""
+    clients = []
+    for _ in range(concurrency):
+        client = AtomeClient(
+            "bench", "bench", USER_ID, USER_REFERENCE, base_uri=base_uri,
+            user_agent="pykeyatome-bench", **(client_kwargs or {})
+        )
+        client.login()
+        clients.append(client)
+
+    latencies = []
+    failures = [0]
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(client):
+        call = getattr(client, endpoint)
+        local = []
+        local_failures = 0
+        barrier.wait()
+        for _ in range(calls):
+            start = time.perf_counter()
+            if call() is None:
+                local_failures += 1
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            failures[0] += local_failures
+
+    threads = [threading.Thread(target=worker, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    cpu_start = time.process_time()
+    barrier.wait()
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    for client in clients:
+        client.close_session()
+
+    latencies.sort()
+    total = len(latencies)
+    return {
+        "calls": total,
+        "failures": failures[0],
+        "rps": total / wall,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies),
+        "cpu_per_call": cpu / total,
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200, help="Calls per worker")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Worker counts"
+    )
+    parser.add_argument(
+        "--endpoint", choices=["get_live", "get_consumption"], nargs="+",
+        default=["get_live", "get_consumption"],
+    )
+    args = parser.parse_args()
+
+    process, base_uri = start_server()
+    try:
+        print(
+            "%-16s %5s %7s %9s %9s %9s %12s"
+            % ("endpoint", "conc", "calls", "req/s", "p50 ms", "p99 ms", "cpu us/call")
+        )
+        for endpoint in args.endpoint:
+            for concurrency in args.concurrency:
+                result = run_level(base_uri, endpoint, concurrency, args.calls)
+                print(
+                    "%-16s %5d %7d %9.0f %9.2f %9.2f %12.1f"
+                    % (
+                        endpoint,
+                        concurrency,
+                        result["calls"],
+                        result["rps"],
+                        result["p50"] * 1e3,
+                        result["p99"] * 1e3,
+                        result["cpu_per_call"] * 1e6,
+                    )
+                )
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
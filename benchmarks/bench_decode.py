@@ -0,0 +1,70 @@
+"""Benchmark the CPU cost of decoding one server response.
+
+Compare the former path (`req.text` then `req.json()`) with the single-pass
+decoder on the bytes, with the standard library and with orjson if installed.
+
+Usage (from the repository root): python -m benchmarks.bench_decode [--number N]
+"""
+import argparse
+import json
+import os
+import timeit
+
+import requests
+
+from pykeyatome import decoder
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "data")
+
+
+def _response(content):
+    """Build a requests.Response as returned by the session."""
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = None
+    response._content = content
+    return response
+
+
+def _old_path(content):
+    # text and json() both decode the body
+    response = _response(content)
+    if response.text == "":
+        return None
+    return response.json()
+
+
+def _new_path(loads):
+    def decode(content):
+        response = _response(content)
+        body = response.content
+        if body == b"":
+            return None
+        return loads(body)
+
+    return decode
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20000, help="Decodes per measure")
+    args = parser.parse_args()
+
+    candidates = [("requests text+json()", _old_path), ("stdlib json single pass", _new_path(json.loads))]
+    if decoder.orjson is not None:
+        candidates.append(("orjson single pass", _new_path(decoder.orjson.loads)))
+
+    for name in ("live.json", "3months.json"):
+        with open(os.path.join(DATA_DIR, name), "rb") as f:
+            content = f.read()
+        print("%s (%d bytes)" % (name, len(content)))
+        for label, decode in candidates:
+            best = min(
+                timeit.repeat(lambda: decode(content), number=args.number, repeat=5)
+            )
+            print("  %-26s %8.2f us/response" % (label, best / args.number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
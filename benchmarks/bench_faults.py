@@ -0,0 +1,104 @@
+"""Benchmark the slow paths of the client with fault injection.
+
+Each scenario starts the stand-in server with some faults and runs sequential
+`get_live()` calls on one logged-in client. Requests are counted on the
+client side through AtomeTransport, so logins and retries are included.
+
+Reported per scenario: success rate, requests spent per successful read,
+p50/p99 latency and the mean latency of the calls that needed more than one
+request (time to recover).
+
+Usage (from the repository root): python -m benchmarks.bench_faults [--calls N]
+"""
+import argparse
+import time
+
+from pykeyatome.client import AtomeClient
+from pykeyatome.transport import AtomeTransport
+
+from .bench_client import USER_ID, USER_REFERENCE, percentile, start_server
+
+SCENARIOS = [
+    ("no fault", []),
+    ("lognormal latency 5ms", ["--latency_ms", "5", "--latency_distribution", "lognormal"]),
+    ("403 rate 10%", ["--forbidden_rate", "0.1"]),
+    ("session expiry / 20 requests", ["--session_requests", "20"]),
+    ("empty body 5%", ["--empty_rate", "0.05"]),
+    ("truncated body 5%", ["--truncated_rate", "0.05"]),
+    ("malformed body 5%", ["--malformed_rate", "0.05"]),
+    ("dropped connection 5%", ["--drop_rate", "0.05"]),
+]
+
+
+def run_scenario(base_uri, calls, timeout):
+    """Run sequential live calls, return the measures."""
+    transport = AtomeTransport()
+    client = AtomeClient(
+        "bench", "bench", USER_ID, USER_REFERENCE, timeout=timeout,
+        transport=transport, user_agent="pykeyatome-bench", base_uri=base_uri
+    )
+    client.login()
+    successes = 0
+    latencies = []
+    recoveries = []
+    requests_before = transport.get_stats()["requests"]
+    for _ in range(calls):
+        sent = transport.get_stats()["requests"]
+        start = time.perf_counter()
+        result = client.get_live()
+        latency = time.perf_counter() - start
+        latencies.append(latency)
+        if result is not None:
+            successes += 1
+            if transport.get_stats()["requests"] - sent > 1:
+                recoveries.append(latency)
+    spent = transport.get_stats()["requests"] - requests_before
+    client.close_session()
+    transport.close()
+
+    latencies.sort()
+    return {
+        "success": successes / calls,
+        "requests_per_read": spent / successes if successes else float("inf"),
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "recovery": sum(recoveries) / len(recoveries) if recoveries else float("nan"),
+        "recovered": len(recoveries),
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500, help="Calls per scenario")
+    parser.add_argument("--timeout", type=float, default=5, help="Client timeout (s)")
+    parser.add_argument("--seed", type=int, default=1, help="Server random seed")
+    args = parser.parse_args()
+
+    print(
+        "%-30s %8s %9s %8s %8s %10s %9s"
+        % ("scenario", "success", "req/read", "p50 ms", "p99 ms", "recovered", "recov ms")
+    )
+    for name, server_args in SCENARIOS:
+        process, base_uri = start_server(*(server_args + ["--seed", str(args.seed)]))
+        try:
+            result = run_scenario(base_uri, args.calls, args.timeout)
+        finally:
+            process.terminate()
+            process.wait()
+        print(
+            "%-30s %7.1f%% %9.3f %8.2f %8.2f %10d %9.2f"
+            % (
+                name,
+                result["success"] * 100,
+                result["requests_per_read"],
+                result["p50"] * 1e3,
+                result["p99"] * 1e3,
+                result["recovered"],
+                result["recovery"] * 1e3,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
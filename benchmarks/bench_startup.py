@@ -0,0 +1,67 @@
+"""Benchmark import time and user-agent cost of session creation.
+
+- wall time of a fresh interpreter importing pykeyatome, and running
+  `python -m pykeyatome --help`, compared with also importing
+  fake_useragent eagerly as the package used to;
+- cost of the user-agent of N new sessions: one `UserAgent()` per session
+  as before, against `get_user_agent()`, which draws from a `UserAgent`
+  built once per process.
+
+Usage (from the repository root): python -m benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from pykeyatome.client import _user_agent_factory, get_user_agent
+
+
+def _wall_time(code, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + code, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter starts per measure")
+    parser.add_argument("--sessions", type=int, default=50, help="Sessions per measure")
+    args = parser.parse_args()
+
+    print("Interpreter startup (median of %d runs)" % args.runs)
+    for label, code in (
+        ("python -c pass", ["-c", "pass"]),
+        ("import pykeyatome", ["-c", "import pykeyatome"]),
+        (
+            "import pykeyatome + eager fake_useragent",
+            ["-c", "import pykeyatome; from fake_useragent import UserAgent"],
+        ),
+        ("python -m pykeyatome --help", ["-m", "pykeyatome", "--help"]),
+    ):
+        print("  %-42s %8.1f ms" % (label, _wall_time(code, args.runs) * 1e3))
+
+    from fake_useragent import UserAgent
+
+    print("User-agent of %d new sessions" % args.sessions)
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        str(UserAgent().random)
+    per_session = (time.perf_counter() - start) / args.sessions
+    print("  %-42s %8.2f ms/session" % ("UserAgent().random per session", per_session * 1e3))
+
+    _user_agent_factory.cache_clear()
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        get_user_agent()
+    per_session = (time.perf_counter() - start) / args.sessions
+    print("  %-42s %8.2f ms/session" % ("get_user_agent(), shared UserAgent", per_session * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Benchmark the conversion of the server timestamps to epoch seconds.
+
+Compare `datetime.fromisoformat` per item with the batched, cached
+`parse_timestamps`, on the days of a consumption payload and on live
+readings (a new time of day on each reading, more than the cache holds:
+the worst case for the cache).
+
+Usage (from the repository root): python -m benchmarks.bench_timestamps [--number N]
+"""
+import argparse
+import datetime
+import timeit
+
+from pykeyatome import timestamps
+
+
+def _fromisoformat(values):
+    epochs = []
+    offsets = []
+    for value in values:
+        moment = datetime.datetime.fromisoformat(value)
+        epochs.append(int(moment.timestamp()))
+        offsets.append(int(moment.utcoffset().total_seconds()))
+    return epochs, offsets
+
+
+def _times(count, step):
+    start = datetime.datetime(2022, 6, 23, tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    return [(start + step * i).isoformat() for i in range(count)]
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=20, help="Series parsed per measure")
+    args = parser.parse_args()
+
+    series = [
+        ("3 months of days", _times(92, datetime.timedelta(days=1))),
+        ("live readings", _times(5000, datetime.timedelta(seconds=7))),
+    ]
+
+    for label, values in series:
+        assert _fromisoformat(values) == timestamps.parse_timestamps(values)
+        print("%s (%d timestamps)" % (label, len(values)))
+        for name, parse in (
+            ("fromisoformat per item", _fromisoformat),
+            ("parse_timestamps", timestamps.parse_timestamps),
+        ):
+            best = min(timeit.repeat(lambda: parse(values), number=args.number, repeat=5))
+            print("  %-24s %8.3f us/timestamp" % (name, best / args.number / len(values) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
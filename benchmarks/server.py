@@ -0,0 +1,257 @@
+"""Local stand-in for the Atome server, serving the tests/data fixtures.
+
+Implements POST /login_check (sets a PHPSESSID cookie),
+GET /api/subscription/<user_id>/<ref>/measure/live.json and
+GET /apiV2/dataJSON/<user_id>/<ref>/3months. Data requests without a known
+PHPSESSID get a 403, as the real server does.
+
+Faults can be injected on data requests (see FaultConfig): latency, random
+403, session expiry after N requests, empty, truncated or malformed bodies
+and dropped connections.
+
+Usage (from the repository root): python -m benchmarks.server [--port N] [faults]
+It prints its base url on the first line of stdout.
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import math
+import random
+import re
+import secrets
+import threading
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "data")
+
+LIVE_PATH = re.compile(r"^/api/subscription/[^/]+/[^/]+/measure/live\.json$")
+CONSUMPTION_PATH = re.compile(r"^/apiV2/dataJSON/[^/]+/[^/]+/3months$")
+SESSION_COOKIE = re.compile(r"PHPSESSID=([^;\s]+)")
+
+
+def _load(name):
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return f.read()
+
+
+class FaultConfig(object):
+    """Faults injected on data requests, rates are probabilities in [0, 1]."""
+
+    LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(
+        self, latency_ms=0.0, latency_distribution="fixed", forbidden_rate=0.0,
+        session_requests=None, empty_rate=0.0, truncated_rate=0.0,
+        malformed_rate=0.0, drop_rate=0.0, seed=None
+    ):
+        """Initialize the fault object."""
+        if latency_distribution not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError("Unknown latency distribution %s" % latency_distribution)
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.forbidden_rate = forbidden_rate
+        # a session is rejected after this number of data requests
+        self.session_requests = session_requests
+        self.empty_rate = empty_rate
+        self.truncated_rate = truncated_rate
+        self.malformed_rate = malformed_rate
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def chance(self, rate):
+        """Draw a fault with probability rate."""
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def latency(self):
+        """Draw a latency in seconds, averaging latency_ms."""
+        mean = self.latency_ms / 1000.0
+        if mean <= 0:
+            return 0.0
+        with self._lock:
+            if self.latency_distribution == "uniform":
+                return self._random.uniform(0, 2 * mean)
+            if self.latency_distribution == "exponential":
+                return self._random.expovariate(1 / mean)
+            if self.latency_distribution == "lognormal":
+                # sigma=1 gives a long tail, mu keeps the mean
+                return self._random.lognormvariate(math.log(mean) - 0.5, 1.0)
+            return mean
+
+    @classmethod
+    def add_arguments(cls, parser):
+        """Add the fault options to an argument parser."""
+        parser.add_argument("--latency_ms", type=float, default=0.0, help="Mean latency")
+        parser.add_argument(
+            "--latency_distribution", choices=cls.LATENCY_DISTRIBUTIONS, default="fixed"
+        )
+        parser.add_argument("--forbidden_rate", type=float, default=0.0, help="403 rate")
+        parser.add_argument(
+            "--session_requests", type=int, help="Expire sessions after N data requests"
+        )
+        parser.add_argument("--empty_rate", type=float, default=0.0, help="Empty body rate")
+        parser.add_argument(
+            "--truncated_rate", type=float, default=0.0, help="Truncated body rate"
+        )
+        parser.add_argument(
+            "--malformed_rate", type=float, default=0.0, help="Invalid JSON body rate"
+        )
+        parser.add_argument(
+            "--drop_rate", type=float, default=0.0, help="Connection dropped rate"
+        )
+        parser.add_argument("--seed", type=int, help="Random seed")
+
+    @classmethod
+    def from_arguments(cls, args):
+        """Build from parsed arguments."""
+        return cls(
+            latency_ms=args.latency_ms,
+            latency_distribution=args.latency_distribution,
+            forbidden_rate=args.forbidden_rate,
+            session_requests=args.session_requests,
+            empty_rate=args.empty_rate,
+            truncated_rate=args.truncated_rate,
+            malformed_rate=args.malformed_rate,
+            drop_rate=args.drop_rate,
+            seed=args.seed,
+        )
+
+
+class AtomeRequestHandler(BaseHTTPRequestHandler):
+    """Handle the requests of one connection, keep-alive enabled."""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, avoid the delayed ACK stall
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        """Keep stderr quiet."""
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _session(self):
+        match = SESSION_COOKIE.search(self.headers.get("Cookie", ""))
+        return match.group(1) if match else None
+
+    def do_POST(self):
+        """Login."""
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        if self.path != "/login_check":
+            self._send(404)
+            return
+        session = self.server.open_session()
+        self._send(
+            302,
+            headers=[("Set-Cookie", "PHPSESSID=%s; path=/" % session), ("Location", "/")],
+        )
+
+    def do_GET(self):
+        """Live and consumption."""
+        if LIVE_PATH.match(self.path):
+            body = self.server.live
+        elif CONSUMPTION_PATH.match(self.path):
+            body = self.server.consumption
+        else:
+            self._send(404)
+            return
+        faults = self.server.faults
+        delay = faults.latency()
+        if delay:
+            time.sleep(delay)
+        if faults.chance(faults.drop_rate):
+            # no answer at all, the client gets a connection error
+            self.close_connection = True
+            return
+        if not self.server.check_session(self._session()) or faults.chance(
+            faults.forbidden_rate
+        ):
+            self._send(403, b"Wrong session")
+            return
+        if faults.chance(faults.empty_rate):
+            body = b""
+        elif faults.chance(faults.truncated_rate):
+            body = body[: len(body) // 2]
+        elif faults.chance(faults.malformed_rate):
+            body = b"<html>Service Unavailable</html>"
+        self._send(200, body, [("Content-Type", "application/json")])
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded stand-in server, bound to 127.0.0.1."""
+
+    daemon_threads = True
+
+    def __init__(self, port=0, faults=None, handler=AtomeRequestHandler):
+        """Initialize the server and load the fixtures."""
+        super().__init__(("127.0.0.1", port), handler)
+        self.live = _load("live.json")
+        self.consumption = _load("3months.json")
+        self.faults = faults if faults is not None else FaultConfig()
+        self._sessions_lock = threading.Lock()
+        # session id -> data requests served
+        self._sessions = {}
+
+    @property
+    def url(self):
+        """Get the base url to give to the client."""
+        return "http://127.0.0.1:%d" % self.server_address[1]
+
+    def open_session(self):
+        """Create a session id."""
+        session = secrets.token_hex(16)
+        with self._sessions_lock:
+            self._sessions[session] = 0
+        return session
+
+    def check_session(self, session):
+        """Tell if a session id is valid, and count one request on it."""
+        limit = self.faults.session_requests
+        with self._sessions_lock:
+            if session not in self._sessions:
+                return False
+            if limit is not None and self._sessions[session] >= limit:
+                del self._sessions[session]
+                return False
+            self._sessions[session] += 1
+            return True
+
+    def start(self):
+        """Serve in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    """Serve until interrupted."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=0, help="Port, 0 for any free one")
+    FaultConfig.add_arguments(parser)
+    args = parser.parse_args()
+    server = StandInServer(args.port, FaultConfig.from_arguments(args))
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,33 @@
 """Init package for pykeyatome."""
+import importlib
+
+from .account import AtomeAccountClient
+from .breaker import CircuitBreaker
+from .cache import LiveCache
 from .client import AtomeClient
+from .metrics import ClientMetrics
+from .retry import RetryPolicy
+from .ring import LiveRing
+from .session_store import FileSessionStore
+from .store import ConsumptionStore
+from .transport import AtomeTransport
+
+# imported on first use, they pull heavy optional dependencies (aiohttp, numpy)
+_LAZY_EXPORTS = {
+    "AsyncAtomeClient": ".async_client",
+    "ConsumptionSeries": ".series",
+}
+
+
+def __getattr__(name):
+    """Import lazy exports on first access."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    try:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+    except ImportError as e:
+        # aiohttp is an optional dependency
+        raise AttributeError("%s is not available: %s" % (name, e)) from e
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
@@ -1,36 +1,143 @@
 """Main to use the atome library."""
 import argparse
+from contextlib import contextmanager
 import json
 import logging
 import sys
+import threading
 
+from pykeyatome.batch import DEFAULT_MAX_WORKERS, iter_batch, load_accounts
 from pykeyatome.client import AtomeClient
+from pykeyatome.consumption_export import FORMATS, ConsumptionWriter
+from pykeyatome.exporter import (
+    DEFAULT_CONSUMPTION_INTERVAL,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    MetricsExporter,
+)
+from pykeyatome.watch import changes, deltas
+
+
+@contextmanager
+def open_output(path):
+    """Open the output file, stdout if no path."""
+    if path is None:
+        yield sys.stdout
+        return
+    with open(path, "w", newline="") as out:
+        yield out
+
+
+def batch(args):
+    """Poll every linky of the config file, one compact JSON line each."""
+    try:
+        accounts = load_accounts(args.config)
+        failed = False
+        with open_output(args.output) as out:
+            writer = ConsumptionWriter(out, args.format) if args.format in FORMATS else None
+            for record in iter_batch(accounts, args.action, args.max_workers):
+                failed = failed or "error" in record
+                if writer is None:
+                    print(json.dumps(record, separators=(",", ":")), file=out, flush=True)
+                elif "error" in record:
+                    print(json.dumps(record, separators=(",", ":")), file=sys.stderr)
+                else:
+                    writer.write(record["data"], record["user_reference"])
+    except KeyboardInterrupt:
+        return 1
+    except BaseException as exp:
+        print(exp)
+        return 1
+    return 1 if failed else 0
 
 
 def main():
     """Define the main function."""
     parser = argparse.ArgumentParser()
-    parser.add_argument("-u", "--username", required=True, help="Atome username")
-    parser.add_argument("-p", "--password", required=True, help="Password")
-    parser.add_argument("-r", "--ref_id", required=True, help="ref_id")
-    parser.add_argument("-i", "--user_id", required=True, help="user_id")
+    parser.add_argument("-u", "--username", help="Atome username")
+    parser.add_argument("-p", "--password", help="Password")
+    parser.add_argument("-r", "--ref_id", help="ref_id")
+    parser.add_argument("-i", "--user_id", help="user_id")
     parser.add_argument("-l", "--atome_linky_number", help="atome_linky_number")
     parser.add_argument(
         "--debug", action="store_true", help="Print debug messages to stderr"
     )
+    parser.add_argument(
+        "--config",
+        help="live/consumption: JSON file of accounts to poll in batch, one NDJSON line per linky",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help="batch: number of accounts polled at a time",
+    )
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=("json",) + FORMATS,
+        help="consumption: json document, or one csv/ndjson row per day",
+    )
+    parser.add_argument(
+        "--output", help="live/consumption: file to write to instead of stdout"
+    )
+    parser.add_argument(
+        "--min_interval", type=float, default=5, help="watch/export: min live polling interval (s)"
+    )
+    parser.add_argument(
+        "--max_interval", type=float, default=60, help="watch/export: max live polling interval (s)"
+    )
+    parser.add_argument(
+        "--count", type=int, help="watch: stop after this number of readings"
+    )
+    parser.add_argument(
+        "--changes_only",
+        action="store_true",
+        help="watch: print only readings whose last/filteredPower/isConnected changed",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="watch: print only the fields that changed since the previous line",
+    )
+    parser.add_argument(
+        "--host", default=DEFAULT_HOST, help="export: address to serve metrics on"
+    )
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="export: port to serve metrics on"
+    )
+    parser.add_argument(
+        "--consumption_interval",
+        type=float,
+        default=DEFAULT_CONSUMPTION_INTERVAL,
+        help="export: consumption polling interval (s)",
+    )
     parser.add_argument(
         "action",
         type=str,
         default="live",
         help="Action",
-        choices=["live", "consumption"],
+        choices=["live", "consumption", "watch", "export"],
     )
     args = parser.parse_args()
-    if args.atome_linky_number:
-        atome_linky_number = int(args.atome_linky_number)
+    if args.format in FORMATS and args.action != "consumption":
+        parser.error("--format %s is only supported by consumption" % args.format)
+    if args.config:
+        if args.action not in ("live", "consumption"):
+            parser.error("--config is only supported by live and consumption")
     else:
-        atome_linky_number = 1
-    client = AtomeClient(args.username, args.password, args.user_id, args.ref_id, atome_linky_number)
+        missing = [
+            option
+            for option, value in (
+                ("-u/--username", args.username),
+                ("-p/--password", args.password),
+                ("-r/--ref_id", args.ref_id),
+                ("-i/--user_id", args.user_id),
+            )
+            if not value
+        ]
+        if missing:
+            parser.error("the following arguments are required: " + ", ".join(missing))
 
     if args.debug:
         # You must initialize logging, otherwise you'll not see debug output.
@@ -40,10 +147,20 @@ def main():
         requests_log.setLevel(logging.DEBUG)
         requests_log.propagate = True
 
+    if args.config:
+        return batch(args)
+
+    if args.atome_linky_number:
+        atome_linky_number = int(args.atome_linky_number)
+    else:
+        atome_linky_number = 1
+    client = AtomeClient(args.username, args.password, args.user_id, args.ref_id, atome_linky_number)
+
     if args.action == "live":
         try:
             client.login()
-            print(json.dumps(client.get_live(), indent=2))
+            with open_output(args.output) as out:
+                print(json.dumps(client.get_live(), indent=2), file=out)
         except BaseException as exp:
             print(exp)
             return 1
@@ -53,17 +170,70 @@ def main():
     elif args.action == "consumption":
         try:
             client.login()
-            print(json.dumps(client.get_consumption(), indent=2))
+            with open_output(args.output) as out:
+                if args.format in FORMATS:
+                    # rows are written as they are flattened, no full document
+                    ConsumptionWriter(out, args.format).write(
+                        client.get_consumption(), args.ref_id
+                    )
+                else:
+                    print(json.dumps(client.get_consumption(), indent=2), file=out)
+
+        except BaseException as exp:
+            print(exp)
+            return 1
+        finally:
+            client.close_session()
+
+    elif args.action == "watch":
+        try:
+            client.login()
+            readings = client.watch(args.min_interval, args.max_interval, args.count)
+            if args.changes_only:
+                readings = changes(readings)
+            if args.delta:
+                readings = deltas(readings)
+            for reading in readings:
+                # one compact line per reading
+                print(json.dumps(reading, separators=(",", ":")), flush=True)
+        except KeyboardInterrupt:
+            pass
+        except BaseException as exp:
+            print(exp)
+            return 1
+        finally:
+            client.close_session()
 
+    elif args.action == "export":
+        exporter = None
+        try:
+            client.login()
+            exporter = MetricsExporter(
+                client,
+                args.host,
+                args.port,
+                args.min_interval,
+                args.max_interval,
+                args.consumption_interval,
+            ).start()
+            print("Serving metrics on http://%s:%s/metrics" % exporter.address, flush=True)
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
         except BaseException as exp:
             print(exp)
             return 1
         finally:
+            if exporter is not None:
+                exporter.stop()
             client.close_session()
     else:
         print("Action not implemented %s", args.action)
         print(
-            "Usage : __main__ -u username -p pwd [--debug] [live|consumption] -i user_id -r ref_id"
+            "Usage : __main__ -u username -p pwd [--debug] [live|consumption|watch|export] -i user_id -r ref_id"
+        )
+        print(
+            "Or : __main__ --config accounts.json [--max_workers n] [live|consumption]"
         )
 
 
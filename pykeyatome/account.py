@@ -0,0 +1,91 @@
+"""Class client for all the linky of one atome account."""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from .client import AtomeClient
+
+# requests keeps 10 connections per host by default
+DEFAULT_MAX_WORKERS = 10
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AtomeAccountClient(object):
+    """Fetch the data of every linky of one account over a single session."""
+
+    def __init__(
+        self,
+        username,
+        password,
+        user_id,
+        user_references,
+        session=None,
+        timeout=None,
+        max_workers=DEFAULT_MAX_WORKERS,
+        transport=None,
+    ):
+        """Initialize the account object."""
+        self.username = username
+        self.password = password
+        self._user_id = user_id
+        self._user_references = list(user_references)
+        self._max_workers = max_workers
+        self._clients = {
+            reference: AtomeClient(
+                username,
+                password,
+                user_id,
+                reference,
+                atome_linky_number=index + 1,
+                session=session,
+                timeout=timeout,
+                transport=transport,
+            )
+            for index, reference in enumerate(self._user_references)
+        }
+        # the session is shared, so is its relogin
+        gate = self._clients[self._user_references[0]]._login_gate
+        for client in self._clients.values():
+            client._login_gate = gate
+
+    def login(self):
+        """Login once and share the session with every linky."""
+        leader = self._clients[self._user_references[0]]
+        if leader.login() is None:
+            return None
+        for client in self._clients.values():
+            client._session = leader._session
+        return {"user_id": self._user_id, "user_references": self.get_user_references()}
+
+    def get_user_references(self):
+        """Get the user references of the account."""
+        return list(self._user_references)
+
+    def get_client(self, user_reference):
+        """Get the client of one linky."""
+        return self._clients[user_reference]
+
+    def _fetch_all(self, method):
+        workers = max(1, min(self._max_workers, len(self._clients)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                reference: executor.submit(getattr(client, method))
+                for reference, client in self._clients.items()
+            }
+            return {reference: future.result() for reference, future in futures.items()}
+
+    def get_live(self):
+        """Get current data of every linky, keyed by user reference."""
+        return self._fetch_all("get_live")
+
+    def get_consumption(self):
+        """Get consumption of every linky, keyed by user reference."""
+        return self._fetch_all("get_consumption")
+
+    def close_session(self):
+        """Close current session."""
+        leader = self._clients[self._user_references[0]]
+        if leader._session is not None:
+            leader.close_session()
+        for client in self._clients.values():
+            client._session = None
@@ -0,0 +1,279 @@
+"""Class asyncio client for atome protocol."""
+import asyncio
+import logging
+import time
+
+import aiohttp
+
+from .client import (
+    API_BASE_URI,
+    API_ENDPOINT_LOGIN,
+    CONSUMPTION_ENDPOINT,
+    COOKIE_NAME,
+    DEFAULT_TIMEOUT,
+    LIVE_ENDPOINT,
+    consumption_url,
+    get_user_agent,
+    live_url,
+)
+from .decoder import loads
+from .retry import (
+    DEADLINE_EXCEEDED,
+    OUTAGE_REASONS,
+    RETRY_CONNECTION,
+    RETRY_FORBIDDEN,
+    RETRY_TIMEOUT,
+    RetryPolicy,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncAtomeClient(object):
+    """The asyncio client class."""
+
+    def __init__(
+        self,
+        username,
+        password,
+        user_id,
+        user_reference,
+        atome_linky_number=1,
+        session=None,
+        timeout=None,
+        user_agent=None,
+        base_uri=API_BASE_URI,
+        metrics=None,
+        retry_policy=None,
+        circuit_breaker=None,
+    ):
+        """Initialize the client object."""
+        self.username = username
+        self.password = password
+        self._user_id = user_id
+        self._user_reference = user_reference  # reference ID in web account
+        self._session = session
+        self._data = {}
+        self._timeout = timeout
+        self._user_agent = user_agent
+        self._base_uri = base_uri
+        self._metrics = metrics
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # may be shared with other clients, see CircuitBreaker.for_host
+        self._circuit_breaker = circuit_breaker
+        # created in the event loop on first use: before python 3.10 a lock
+        # made in __init__ is bound to get_event_loop(), not the running loop
+        self._login_lock = None
+        # incremented on each login attempt
+        self._login_generation = 0
+        # internal array start from 0 and not 1. Shift by 1.
+        self._atome_linky_number = int(atome_linky_number) - 1
+
+    def _get_login_lock(self):
+        """Get the login lock, only call it from a coroutine."""
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        return self._login_lock
+
+    async def login(self):
+        """Set http session."""
+        async with self._get_login_lock():
+            return await self._gated_login()
+
+    async def _relogin(self, generation, deadline=None):
+        """Relogin, unless another caller already did it since generation.
+
+        The login request is bounded by deadline (monotonic time) if given.
+        """
+        async with self._get_login_lock():
+            if self._login_generation != generation:
+                _LOGGER.debug("Session already renewed by another caller")
+                return
+            if deadline is not None and deadline - time.monotonic() <= 0:
+                _LOGGER.debug("Deadline exceeded, no relogin")
+                return
+            if self._metrics is not None:
+                self._metrics.record_relogin()
+            await self._gated_login(deadline)
+
+    async def _gated_login(self, deadline=None):
+        """Login, the login lock must be held."""
+        if self._session is None:
+            # each client keeps its own cookie jar, so PHPSESSID is never shared
+            self._session = aiohttp.ClientSession(
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                # adding fake user-agent header, unless one is given
+                headers={"User-agent": self._user_agent or get_user_agent()},
+            )
+        try:
+            return await self._login(deadline)
+        finally:
+            self._login_generation += 1
+
+    async def _login(self, deadline=None):
+        """Login to Atome's API."""
+        payload = {"_username": self.username, "_password": self.password}
+        start = time.perf_counter()
+
+        try:
+            async with self._session.post(
+                self._base_uri + API_ENDPOINT_LOGIN,
+                data=payload,
+                allow_redirects=False,
+                timeout=self._client_timeout(deadline),
+            ) as req:
+                await req.read()
+        except (OSError, aiohttp.ClientError) as e:
+            _LOGGER.debug("Can not login to API: " + str(e))
+            if self._metrics is not None:
+                self._metrics.record_login(time.perf_counter() - start, False)
+            return None
+
+        cookies = {cookie.key: cookie.value for cookie in self._session.cookie_jar}
+        success = COOKIE_NAME in cookies
+        if self._metrics is not None:
+            self._metrics.record_login(time.perf_counter() - start, success)
+
+        if not success:
+            _LOGGER.debug("Login failed - no PHPSESSID")
+            return None
+
+        return {"user_id": self._user_id, "user_reference": self._user_reference}
+
+    def get_user_reference(self):
+        """Get user reference respect to linky number."""
+        return self._user_reference
+
+    def get_circuit_state(self):
+        """Get the circuit breaker state (closed, open, half_open), None if unused."""
+        if self._circuit_breaker is None:
+            return None
+        return self._circuit_breaker.get_state()
+
+    def _client_timeout(self, deadline=None):
+        """Get the timeout of one request, bounded by the call deadline."""
+        timeout = self._timeout if self._timeout is not None else DEFAULT_TIMEOUT
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        return aiohttp.ClientTimeout(total=timeout)
+
+    async def _get_info_from_server(self, url, endpoint=None):
+        policy = self._retry_policy
+        deadline = None
+        if policy.deadline is not None:
+            deadline = time.monotonic() + policy.deadline
+
+        attempt = 0
+        while True:
+            generation = self._login_generation
+            if deadline is not None and time.monotonic() >= deadline:
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            breaker = self._circuit_breaker
+            if breaker is not None and not breaker.allow_request():
+                _LOGGER.debug("Circuit open, Atome's API not called")
+                return None
+            answered = False
+            try:
+                json_output, reason = await self._request_once(url, endpoint, deadline)
+                answered = reason != DEADLINE_EXCEEDED
+            finally:
+                if breaker is not None and not answered:
+                    breaker.release_probe()
+            if reason == DEADLINE_EXCEEDED:
+                # no request was sent, the breaker learns nothing
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            if breaker is not None:
+                if reason in OUTAGE_REASONS:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if reason is None:
+                return json_output
+            if not policy.should_retry(reason, attempt):
+                _LOGGER.debug("Can't gather proper data. Max retries exceeded.")
+                return None
+
+            if reason == RETRY_FORBIDDEN:
+                # session is wrong, need to relogin (once for all concurrent callers)
+                await self._relogin(generation, deadline)
+            delay = policy.get_delay(reason, attempt)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            _LOGGER.info(
+                "Got error %s, retry in %.2fs (retries: %s)", reason, delay, attempt
+            )
+            if self._metrics is not None:
+                self._metrics.record_retry(endpoint)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request_once(self, url, endpoint, deadline):
+        """Do one request, return (json or None, retry reason or None)."""
+        metrics = self._metrics
+        timeout = self._client_timeout(deadline)
+        if timeout.total <= 0:
+            return None, DEADLINE_EXCEEDED
+
+        start = time.perf_counter()
+        try:
+            async with self._session.get(url, timeout=timeout) as req:
+                status = req.status
+                body = await req.read()
+        except (asyncio.TimeoutError, OSError, aiohttp.ClientError) as e:
+            _LOGGER.debug("Could not access Atome's API: " + str(e))
+            if metrics is not None:
+                metrics.record_request(endpoint, time.perf_counter() - start)
+            if isinstance(e, asyncio.TimeoutError):
+                return None, RETRY_TIMEOUT
+            return None, RETRY_CONNECTION
+        if metrics is not None:
+            metrics.record_request(
+                endpoint, time.perf_counter() - start, status, len(body)
+            )
+
+        reason = self._retry_policy.classify_status(status)
+        if reason is not None:
+            return None, reason
+
+        if body == b"":
+            _LOGGER.debug("No data")
+            return None, None
+
+        start = time.perf_counter()
+        try:
+            json_output = loads(body)
+        except ValueError as e:
+            _LOGGER.debug(
+                "Impossible to decode response: "
+                + str(e)
+                + "\nResponse was: "
+                + body.decode("utf-8", "replace")
+            )
+            json_output = None
+        if metrics is not None:
+            metrics.record_decode(endpoint, time.perf_counter() - start)
+
+        return json_output, None
+
+    async def get_live(self):
+        """Get current data."""
+        return await self._get_info_from_server(
+            live_url(self._user_id, self._user_reference, self._base_uri),
+            endpoint=LIVE_ENDPOINT,
+        )
+
+    async def get_consumption(self):
+        """Get current data."""
+        return await self._get_info_from_server(
+            consumption_url(self._user_id, self._user_reference, self._base_uri),
+            endpoint=CONSUMPTION_ENDPOINT,
+        )
+
+    async def close_session(self):
+        """Close current session."""
+        await self._session.close()
+        self._session = None
@@ -0,0 +1,152 @@
+"""Poll many atome accounts concurrently in one process."""
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import queue
+
+from .account import AtomeAccountClient
+from .transport import AtomeTransport
+
+DEFAULT_MAX_WORKERS = 10
+ACTIONS = ("live", "consumption")
+# end of the records of one account
+_DONE = object()
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_accounts(path):
+    """Get the accounts of a JSON config file.
+
+    The file holds a list of accounts, or {"accounts": [...]}. Each account
+    has username, password, user_id and user_references (a list) or
+    user_reference.
+    """
+    with open(path, "r") as f:
+        config = json.load(f)
+    if isinstance(config, dict):
+        config = config.get("accounts", [])
+    accounts = []
+    for index, account in enumerate(config):
+        references = account.get("user_references")
+        if references is None and account.get("user_reference") is not None:
+            references = [account["user_reference"]]
+        missing = [
+            key for key in ("username", "password", "user_id") if not account.get(key)
+        ]
+        if missing or not references:
+            raise ValueError(
+                "Account %s of %s misses %s"
+                % (index, path, ", ".join(missing or ["user_references"]))
+            )
+        accounts.append(
+            {
+                "username": account["username"],
+                "password": account["password"],
+                "user_id": str(account["user_id"]),
+                "user_references": [str(reference) for reference in references],
+            }
+        )
+    return accounts
+
+
+def _record(account, reference, data=None, error=None):
+    record = {
+        "username": account["username"],
+        "user_id": account["user_id"],
+        "user_reference": reference,
+    }
+    if error is None:
+        record["data"] = data
+    else:
+        record["error"] = error
+    return record
+
+
+def _poll_account(account, action, transport, timeout, emit):
+    """Login once and fetch every linky of the account, one after the other.
+
+    emit(record) is called as soon as each linky is fetched.
+    """
+    references = account["user_references"]
+    emitted = set()
+    client = None
+    try:
+        client = AtomeAccountClient(
+            account["username"],
+            account["password"],
+            account["user_id"],
+            references,
+            max_workers=1,
+            timeout=timeout,
+            transport=transport,
+        )
+        if client.login() is None:
+            error = "login failed"
+        else:
+            error = None
+            for reference in references:
+                data = getattr(client.get_client(reference), "get_" + action)()
+                if data is None:
+                    emit(_record(account, reference, error="no data"))
+                else:
+                    emit(_record(account, reference, data))
+                emitted.add(reference)
+    except Exception as e:
+        _LOGGER.debug("Batch poll of %s failed: %s", account["username"], e)
+        error = str(e)
+    finally:
+        if client is not None:
+            client.close_session()
+    for reference in references:
+        if reference not in emitted:
+            emit(_record(account, reference, error=error))
+
+
+def iter_batch(
+    accounts,
+    action="live",
+    max_workers=DEFAULT_MAX_WORKERS,
+    transport=None,
+    timeout=None,
+):
+    """Yield one record per linky, as soon as it is fetched.
+
+    At most max_workers accounts are polled at a time, over one shared
+    connection pool. A record holds username, user_id, user_reference and
+    either data or error. Closing the generator early skips the accounts
+    not polled yet.
+    """
+    if action not in ACTIONS:
+        raise ValueError("Batch action must be one of %s" % ", ".join(ACTIONS))
+    accounts = list(accounts)
+    workers = max(1, max_workers)
+    own_transport = transport is None
+    if own_transport:
+        transport = AtomeTransport(pool_maxsize=workers)
+    # records of every worker, then one _DONE per account
+    results = queue.Queue()
+
+    def run(account):
+        try:
+            _poll_account(account, action, transport, timeout, results.put)
+        finally:
+            results.put(_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = [executor.submit(run, account) for account in accounts]
+    try:
+        done = 0
+        while done < len(accounts):
+            record = results.get()
+            if record is _DONE:
+                done += 1
+            else:
+                yield record
+    finally:
+        # closed early (break, Ctrl-C): only wait for the accounts in progress
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+        if own_transport:
+            transport.close()
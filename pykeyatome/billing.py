@@ -0,0 +1,125 @@
+"""Re-pricing of the daily consumption under other tariffs."""
+import bisect
+import datetime
+
+from .series import COLUMNS, ConsumptionSeries, new_column, np
+
+_EPOCH = datetime.date(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+# index are in Wh, prices in currency per kWh
+_WH_PER_KWH = 1000
+
+
+class Tariff(object):
+    """Energy prices per kWh of index1 and index2.
+
+    A base tariff has one price for both index, give only price1.
+    """
+
+    def __init__(self, price1, price2=None):
+        """Initialize the tariff object."""
+        self.price1 = float(price1)
+        self.price2 = self.price1 if price2 is None else float(price2)
+
+
+class TariffSchedule(object):
+    """Tariffs applying from given local dates, each until the next one."""
+
+    def __init__(self, tariffs):
+        """Initialize the schedule from (first date, Tariff) pairs."""
+        tariffs = sorted(tariffs, key=lambda pair: pair[0])
+        if not tariffs:
+            raise ValueError("A schedule needs at least one tariff")
+        self.starts = [(start - _EPOCH).days for start, _ in tariffs]
+        if len(set(self.starts)) != len(self.starts):
+            raise ValueError("Two tariffs start on the same date")
+        self.price1 = [tariff.price1 for _, tariff in tariffs]
+        self.price2 = [tariff.price2 for _, tariff in tariffs]
+
+    def get_tariff_index(self, day):
+        """Get the index of the tariff of a day since epoch."""
+        index = bisect.bisect_right(self.starts, day) - 1
+        if index < 0:
+            first = _EPOCH + datetime.timedelta(days=self.starts[0])
+            raise ValueError("No tariff before %s" % first)
+        return index
+
+
+def _numpy_prices(schedule, time, offset):
+    days = (time + offset) // _SECONDS_PER_DAY
+    indexes = (
+        np.searchsorted(np.asarray(schedule.starts, dtype="int64"), days, side="right")
+        - 1
+    )
+    if len(indexes) and indexes.min() < 0:
+        # raise the same error as the python path
+        schedule.get_tariff_index(int(days.min()))
+    return (
+        np.asarray(schedule.price1, dtype="float64")[indexes],
+        np.asarray(schedule.price2, dtype="float64")[indexes],
+    )
+
+
+def _numpy_reprice(series_list, schedule):
+    lengths = [len(series) for series in series_list]
+
+    def joined(name):
+        return np.concatenate(
+            [np.asarray(getattr(series, name)) for series in series_list]
+        )
+
+    # one pass over every meter
+    price1, price2 = _numpy_prices(schedule, joined("time"), joined("offset"))
+    repriced = {
+        "priceindex1": price1,
+        "priceindex2": price2,
+        "bill1": joined("index1") * price1 / _WH_PER_KWH,
+        "bill2": joined("index2") * price2 / _WH_PER_KWH,
+    }
+    bounds = np.cumsum(lengths)[:-1]
+    columns = {name: np.split(column, bounds) for name, column in repriced.items()}
+    result = []
+    for i, series in enumerate(series_list):
+        values = {name: getattr(series, name) for name in COLUMNS}
+        values.update({name: parts[i] for name, parts in columns.items()})
+        result.append(ConsumptionSeries(values))
+    return result
+
+
+def _python_reprice(series, schedule):
+    values = {name: getattr(series, name) for name in COLUMNS}
+    for name in ("priceindex1", "priceindex2", "bill1", "bill2"):
+        values[name] = []
+    for i in range(len(series)):
+        index = schedule.get_tariff_index(
+            (series.time[i] + series.offset[i]) // _SECONDS_PER_DAY
+        )
+        price1, price2 = schedule.price1[index], schedule.price2[index]
+        values["priceindex1"].append(price1)
+        values["priceindex2"].append(price2)
+        values["bill1"].append(series.index1[i] * price1 / _WH_PER_KWH)
+        values["bill2"].append(series.index2[i] * price2 / _WH_PER_KWH)
+    for name in ("priceindex1", "priceindex2", "bill1", "bill2"):
+        values[name] = new_column(name, values[name], False)
+    return ConsumptionSeries(values)
+
+
+def reprice_many(series_list, schedule):
+    """Reprice several ConsumptionSeries, get the list of repriced series.
+
+    With numpy, all the series are priced in one vectorized pass.
+    """
+    series_list = list(series_list)
+    if series_list and all(series.uses_numpy for series in series_list):
+        return _numpy_reprice(series_list, schedule)
+    return [_python_reprice(series, schedule) for series in series_list]
+
+
+def reprice(series, schedule):
+    """Get a copy of a ConsumptionSeries billed under a TariffSchedule.
+
+    bill1, bill2, priceindex1 and priceindex2 are replaced, the tariff of
+    each entry is the one of its local date. Give the result to `rollup`
+    for monthly or yearly bills.
+    """
+    return reprice_many([series], schedule)[0]
@@ -0,0 +1,141 @@
+"""Circuit breaker for upstream outages."""
+import logging
+import threading
+import time
+from typing import Dict
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIMEOUT = 30
+DEFAULT_HALF_OPEN_MAX_CALLS = 1
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_LOGGER = logging.getLogger(__name__)
+
+_BREAKERS: Dict[str, "CircuitBreaker"] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+class CircuitBreaker(object):
+    """Fail fast after repeated upstream failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail at once. After recovery_timeout seconds it is half open: up to
+    half_open_max_calls probe requests go through, a success closes the
+    circuit, a failure opens it again. Thread safe, it can be shared by
+    every client hitting the same host (see `for_host`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+        recovery_timeout=DEFAULT_RECOVERY_TIMEOUT,
+        half_open_max_calls=DEFAULT_HALF_OPEN_MAX_CALLS,
+    ):
+        """Initialize the breaker object."""
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probes = 0
+
+    @classmethod
+    def for_host(cls, host, **kwargs):
+        """Get the breaker shared by every client of host, created on first use.
+
+        kwargs are the settings of the breaker when it is created. Later calls
+        may omit them, but raise ValueError if they give different ones.
+        """
+        with _BREAKERS_LOCK:
+            breaker = _BREAKERS.get(host)
+            if breaker is None:
+                breaker = _BREAKERS[host] = cls(**kwargs)
+                return breaker
+        settings = breaker.get_settings()
+        conflicts = sorted(
+            name for name, value in kwargs.items() if settings.get(name) != value
+        )
+        if conflicts:
+            raise ValueError(
+                "Breaker of %s already exists with other %s"
+                % (host, ", ".join(conflicts))
+            )
+        return breaker
+
+    def get_settings(self):
+        """Get the settings given at creation."""
+        return {
+            "failure_threshold": self._failure_threshold,
+            "recovery_timeout": self._recovery_timeout,
+            "half_open_max_calls": self._half_open_max_calls,
+        }
+
+    def _update_state(self):
+        """Move from open to half open once the recovery timeout elapsed."""
+        if (
+            self._state == STATE_OPEN
+            and time.monotonic() - self._opened_at >= self._recovery_timeout
+        ):
+            self._state = STATE_HALF_OPEN
+            self._probes = 0
+
+    def allow_request(self):
+        """Tell if a request may be sent now."""
+        with self._lock:
+            self._update_state()
+            if self._state == STATE_CLOSED:
+                return True
+            if (
+                self._state == STATE_HALF_OPEN
+                and self._probes < self._half_open_max_calls
+            ):
+                self._probes += 1
+                return True
+            return False
+
+    def release_probe(self):
+        """Give back the probe slot of a request that got no answer.
+
+        Call it when an allowed request was not sent, was cancelled or
+        raised, else a half open circuit would deny every request.
+        """
+        with self._lock:
+            if self._state == STATE_HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self):
+        """Record an answer of the server."""
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                _LOGGER.info("Circuit closed, server is back")
+            self._state = STATE_CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        """Record an outage symptom: 5xx, timeout or connection error."""
+        with self._lock:
+            self._failures += 1
+            if self._state == STATE_HALF_OPEN or (
+                self._state == STATE_CLOSED
+                and self._failures >= self._failure_threshold
+            ):
+                _LOGGER.info("Circuit opened after %s failures", self._failures)
+                self._state = STATE_OPEN
+                self._opened_at = time.monotonic()
+
+    def get_state(self):
+        """Get the state: closed, open or half_open."""
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def get_dict(self):
+        """Get the state and the consecutive failure count."""
+        with self._lock:
+            self._update_state()
+            return {"state": self._state, "failures": self._failures}
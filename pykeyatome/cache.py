@@ -0,0 +1,98 @@
+"""In-process cache of live data."""
+from collections import OrderedDict
+import logging
+import threading
+import time
+
+DEFAULT_TTL = 1
+DEFAULT_STALE_TTL = 5
+DEFAULT_MAXSIZE = 128
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Flight(object):
+    """One fetch in progress, its result is shared by the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class LiveCache(object):
+    """TTL cache with stale-while-revalidate and LRU eviction.
+
+    Keys are (user_id, user_reference). An entry younger than ttl is served as
+    is. Up to ttl + stale_ttl it is still served, while one background fetch
+    refreshes it. Older entries are fetched synchronously. A key is fetched
+    by one caller at a time, concurrent callers wait for its result. Failed
+    fetches (None) are never cached. Cached values are shared, do not modify
+    them.
+    """
+
+    def __init__(
+        self, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL, maxsize=DEFAULT_MAXSIZE
+    ):
+        """Initialize the cache object."""
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        # key -> (timestamp, value), least recently used first
+        self._entries = OrderedDict()
+        # key -> fetch in progress
+        self._flights = {}
+
+    def get(self, key, fetch):
+        """Get the value of key, calling fetch() when it is missing or too old."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age < self._ttl + self._stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age >= self._ttl and key not in self._flights:
+                        flight = self._flights[key] = _Flight()
+                        threading.Thread(
+                            target=self._fetch, args=(key, fetch, flight), daemon=True
+                        ).start()
+                    return entry[1]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if leader:
+            return self._fetch(key, fetch, flight)
+        flight.done.wait()
+        return flight.value
+
+    def _fetch(self, key, fetch, flight):
+        try:
+            value = fetch()
+            if value is not None:
+                with self._lock:
+                    self._entries[key] = (time.monotonic(), value)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self._maxsize:
+                        evicted, _ = self._entries.popitem(last=False)
+                        _LOGGER.debug("Evict %s from live cache", str(evicted))
+            flight.value = value
+            return value
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self):
+        """Get the number of cached entries."""
+        with self._lock:
+            return len(self._entries)
@@ -1,11 +1,23 @@
 """Class client for atome protocol."""
-import json
+import functools
 import logging
+import threading
+import time
+from urllib.parse import urlsplit
 
 import requests
-import json
-import simplejson
-from fake_useragent import UserAgent
+
+from .decoder import loads
+from .retry import (
+    DEADLINE_EXCEEDED,
+    DEFAULT_MAX_RETRIES,
+    OUTAGE_REASONS,
+    RETRY_CONNECTION,
+    RETRY_FORBIDDEN,
+    RETRY_TIMEOUT,
+    RetryPolicy,
+)
+from .watch import DEFAULT_MAX_INTERVAL, DEFAULT_MIN_INTERVAL, LiveWatcher
 
 # export const
 DAILY_PERIOD_TYPE = "day"
@@ -19,26 +31,87 @@ COOKIE_NAME = "PHPSESSID"
 API_BASE_URI = "https://esoftlink.esoftthings.com"
 API_ENDPOINT_LOGIN = "/login_check"
 API_ENDPOINT_LIVE = "/measure/live.json"
+API_ENDPOINT_CONSUMPTION = "/3months"
 LOGIN_URL = API_BASE_URI + API_ENDPOINT_LOGIN
 
+# endpoint names used by the metrics
+LIVE_ENDPOINT = "live"
+CONSUMPTION_ENDPOINT = "consumption"
+
 DEFAULT_TIMEOUT = 10
-MAX_RETRIES = 3
+MAX_RETRIES = DEFAULT_MAX_RETRIES
+
+# proactive session refresh, at a fraction of the session lifetime
+DEFAULT_REFRESH_MARGIN = 0.8
+# a 403 on a younger session is not taken as its lifetime
+MIN_SESSION_LIFETIME = 60
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _user_agent_factory():
+    """Get the fake user-agent generator, built once per process."""
+    # fake_useragent loads its data file, import it only when needed
+    from fake_useragent import UserAgent
+
+    return UserAgent()
+
+
+def get_user_agent():
+    """Get a random fake browser user-agent, a new one per call."""
+    return str(_user_agent_factory().random)
+
+
+def live_url(user_id, user_reference, base_uri=API_BASE_URI):
+    """Build the live endpoint url of a linky."""
+    return (
+        base_uri
+        + "/api/subscription/"
+        + user_id
+        + "/"
+        + user_reference
+        + API_ENDPOINT_LIVE
+    )
+
+
+def consumption_url(user_id, user_reference, base_uri=API_BASE_URI):
+    """Build the consumption endpoint url of a linky."""
+    return (
+        base_uri
+        + "/apiV2/dataJSON/"
+        + user_id
+        + "/"
+        + user_reference
+        + API_ENDPOINT_CONSUMPTION
+    )
+
+
 class PyAtomeError(Exception):
     """Exception class."""
 
     pass
 
 
+class LoginGate(object):
+    """Single-flight login state, shared by clients using the same session."""
+
+    def __init__(self):
+        """Initialize the gate object."""
+        self.lock = threading.Lock()
+        # incremented on each login attempt
+        self.generation = 0
+
+
 class AtomeClient(object):
     """The client class."""
 
     def __init__(
         self, username, password, user_id, user_reference,
-        atome_linky_number=1, session=None, timeout=None
+        atome_linky_number=1, session=None, timeout=None, transport=None,
+        session_refresh=False, session_lifetime=None, refresh_margin=DEFAULT_REFRESH_MARGIN,
+        live_cache=None, user_agent=None, base_uri=API_BASE_URI, metrics=None,
+        retry_policy=None, circuit_breaker=None, session_store=None
     ):
         """Initialize the client object."""
         self.username = username
@@ -48,33 +121,156 @@ class AtomeClient(object):
         self._session = session
         self._data = {}
         self._timeout = timeout
+        self._transport = transport
+        self._login_gate = LoginGate()
+        self._session_refresh = session_refresh
+        # seconds, guessed or observed from the server
+        self._session_lifetime = session_lifetime
+        self._refresh_margin = refresh_margin
+        self._session_started = None
+        self._refresh_timer = None
+        self._live_cache = live_cache
+        self._user_agent = user_agent
+        # another server, e.g. a local stand-in for benchmarks
+        self._base_uri = base_uri
+        self._metrics = metrics
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # may be shared with other clients, see CircuitBreaker.for_host
+        self._circuit_breaker = circuit_breaker
+        # persisted PHPSESSID, reused by login() until the server rejects it
+        self._session_store = session_store
         # internal array start from 0 and not 1. Shift by 1.
         self._atome_linky_number = int(atome_linky_number) - 1
 
     def login(self):
         """Set http session."""
+        with self._login_gate.lock:
+            return self._gated_login(use_store=True)
+
+    def _relogin(self, generation, deadline=None):
+        """Relogin, unless another caller already did it since generation.
+
+        The login request is bounded by deadline (monotonic time) if given.
+        """
+        with self._login_gate.lock:
+            if self._session is None:
+                _LOGGER.debug("Session closed, no relogin")
+                return
+            if self._login_gate.generation != generation:
+                _LOGGER.debug("Session already renewed by another caller")
+                return
+            if self._get_timeout(deadline) is None:
+                _LOGGER.debug("Deadline exceeded, no relogin")
+                return
+            if self._metrics is not None:
+                self._metrics.record_relogin()
+            self._gated_login(deadline=deadline)
+
+    def _gated_login(self, use_store=False, deadline=None):
+        """Login, the login gate lock must be held."""
         if self._session is None:
-            self._session = requests.session()
-            # adding fake user-agent header
-            self._session.headers.update({"User-agent": str(UserAgent().random)})
-        return self._login()
+            if self._transport is not None:
+                self._session = self._transport.new_session()
+            else:
+                self._session = requests.session()
+            # adding fake user-agent header, unless one is given
+            self._session.headers.update(
+                {"User-agent": self._user_agent or get_user_agent()}
+            )
+        if use_store and self._restore_session():
+            self._login_gate.generation += 1
+            self._schedule_refresh()
+            return {"user_id": self._user_id, "user_reference": self._user_reference}
+        try:
+            result = self._login(deadline)
+        finally:
+            self._login_gate.generation += 1
+        if result is not None:
+            self._session_started = time.monotonic()
+            self._schedule_refresh()
+            if self._session_store is not None:
+                self._session_store.save(
+                    self.username, self._session.cookies.get(COOKIE_NAME)
+                )
+        return result
+
+    def _restore_session(self):
+        """Reuse the stored cookie, without checking it with the server."""
+        if self._session_store is None:
+            return False
+        stored = self._session_store.load(self.username)
+        if stored is None:
+            return False
+        cookie, saved = stored
+        self._session.cookies.set(
+            COOKIE_NAME, cookie, domain=urlsplit(self._base_uri).hostname, path="/"
+        )
+        self._session_started = time.monotonic() - max(0.0, time.time() - saved)
+        _LOGGER.debug("Reuse stored session")
+        return True
+
+    def _schedule_refresh(self):
+        """Renew the session in background before it expires."""
+        self._cancel_refresh()
+        if not self._session_refresh or self._session_lifetime is None:
+            return
+        # a restored session may already be old
+        delay = self._session_lifetime * self._refresh_margin - (self.get_session_age() or 0)
+        self._refresh_timer = threading.Timer(
+            max(0.0, delay),
+            self._relogin,
+            args=(self._login_gate.generation,),
+        )
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _cancel_refresh(self):
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    def _session_rejected(self):
+        """Learn the session lifetime from a 403."""
+        age = self.get_session_age()
+        if age is None or age < MIN_SESSION_LIFETIME:
+            return
+        if self._session_lifetime is None or age < self._session_lifetime:
+            _LOGGER.debug("Session lifetime observed: %ss", int(age))
+            self._session_lifetime = age
+
+    def get_session_age(self):
+        """Get the age in seconds of the current session, None if not logged."""
+        if self._session_started is None:
+            return None
+        return time.monotonic() - self._session_started
 
-    def _login(self):
+    def get_session_lifetime(self):
+        """Get the known session lifetime in seconds, None if unknown."""
+        return self._session_lifetime
+
+    def _login(self, deadline=None):
         """Login to Atome's API."""
         error_flag = False
         payload = {"_username": self.username, "_password": self.password}
+        timeout = self._get_timeout(deadline)
+        if timeout is None:
+            _LOGGER.debug("Deadline exceeded, no login")
+            return None
+        start = time.perf_counter()
 
         try:
             req = self._session.post(
-                LOGIN_URL,
+                self._base_uri + API_ENDPOINT_LOGIN,
                 data=payload,
                 allow_redirects=False,
-                timeout=self._timeout,
+                timeout=timeout,
             )
         except OSError:
             _LOGGER.debug("Can not login to API")
             error_flag = True
         if error_flag:
+            if self._metrics is not None:
+                self._metrics.record_login(time.perf_counter() - start, False)
             return None
 
         cookies = self._session.cookies.get_dict()
@@ -82,6 +278,8 @@ class AtomeClient(object):
         if "PHPSESSID" not in cookies:
             _LOGGER.debug("Login failed - no PHPSESSID")
             error_flag = True
+        if self._metrics is not None:
+            self._metrics.record_login(time.perf_counter() - start, not error_flag)
         if error_flag:
             return None
 
@@ -91,80 +289,177 @@ class AtomeClient(object):
         """Get user reference respect to linky number."""
         return self._user_reference
 
-    def _get_info_from_server(self, url, max_retries=0):
-        error_flag = False
-
-        if max_retries > MAX_RETRIES:
-            _LOGGER.debug("Can't gather proper data. Max retries exceeded.")
-            error_flag = True
+    def get_circuit_state(self):
+        """Get the circuit breaker state (closed, open, half_open), None if unused."""
+        if self._circuit_breaker is None:
             return None
-
+        return self._circuit_breaker.get_state()
+
+    def _get_timeout(self, deadline=None):
+        """Get the timeout of one request, bounded by the call deadline.
+
+        Each part of a (connect, read) timeout is bounded. None once the
+        deadline is exceeded.
+        """
+        timeout = self._timeout if self._timeout is not None else DEFAULT_TIMEOUT
+        if deadline is None:
+            return timeout
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return None
+        if isinstance(timeout, tuple):
+            return tuple(left if part is None else min(part, left) for part in timeout)
+        return min(timeout, left)
+
+    def _get_info_from_server(self, url, endpoint=None):
+        policy = self._retry_policy
+        deadline = None
+        if policy.deadline is not None:
+            deadline = time.monotonic() + policy.deadline
+
+        attempt = 0
+        while True:
+            generation = self._login_gate.generation
+            if deadline is not None and time.monotonic() >= deadline:
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            breaker = self._circuit_breaker
+            if breaker is not None and not breaker.allow_request():
+                _LOGGER.debug("Circuit open, Atome's API not called")
+                return None
+            answered = False
+            try:
+                json_output, reason = self._request_once(url, endpoint, deadline)
+                answered = reason != DEADLINE_EXCEEDED
+            finally:
+                if breaker is not None and not answered:
+                    breaker.release_probe()
+            if reason == DEADLINE_EXCEEDED:
+                # no request was sent, the breaker learns nothing
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            if breaker is not None:
+                if reason in OUTAGE_REASONS:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            if reason is None:
+                return json_output
+            if not policy.should_retry(reason, attempt):
+                _LOGGER.debug("Can't gather proper data. Max retries exceeded.")
+                return None
+
+            if reason == RETRY_FORBIDDEN:
+                # session is wrong, need to relogin (once for all concurrent callers)
+                self._session_rejected()
+                self._relogin(generation, deadline)
+            delay = policy.get_delay(reason, attempt)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                _LOGGER.debug("Can't gather proper data. Deadline exceeded.")
+                return None
+            _LOGGER.info(
+                "Got error %s, retry in %.2fs (retries: %s)", reason, delay, attempt
+            )
+            if self._metrics is not None:
+                self._metrics.record_retry(endpoint)
+            if delay > 0:
+                time.sleep(delay)
+            attempt += 1
+
+    def _request_once(self, url, endpoint, deadline):
+        """Do one request, return (json or None, retry reason or None)."""
+        error_flag = False
+        metrics = self._metrics
+        policy = self._retry_policy
+
+        timeout = self._get_timeout(deadline)
+        if timeout is None:
+            return None, DEADLINE_EXCEEDED
+        if metrics is not None:
+            start = time.perf_counter()
         try:
-            req = self._session.get(url, timeout=self._timeout)
+            req = self._session.get(url, timeout=timeout)
 
+        except requests.Timeout as e:
+            _LOGGER.debug("Timeout on Atome's API: " + str(e))
+            reason = RETRY_TIMEOUT
+            error_flag = True
         except OSError as e:
             _LOGGER.debug("Could not access Atome's API: " + str(e))
+            reason = RETRY_CONNECTION
             error_flag = True
         if error_flag:
-            return None
+            if metrics is not None:
+                metrics.record_request(endpoint, time.perf_counter() - start)
+            return None, reason
+
+        # read the body once, decode it once
+        body = req.content
+        if metrics is not None:
+            metrics.record_request(
+                endpoint, time.perf_counter() - start, req.status_code, len(body)
+            )
 
-        if req.status_code == 403:
-            # session is wrong, need to relogin
-            self.login()
-            logging.info("Got error %s, relogging (max retries: %s)", str(req.status_code), str(max_retries))
-            return self._get_info_from_server(url, max_retries + 1)
+        reason = policy.classify_status(req.status_code)
+        if reason is not None:
+            return None, reason
 
-        if req.text == "":
+        if body == b"":
             _LOGGER.debug("No data")
-            error_flag = True
-            return None
+            return None, None
 
+        if metrics is not None:
+            start = time.perf_counter()
         try:
-            json_output = req.json()
-        except (
-            OSError,
-            json.decoder.JSONDecodeError,
-            simplejson.errors.JSONDecodeError,
-        ) as e:
+            json_output = loads(body)
+        except ValueError as e:
             _LOGGER.debug(
                 "Impossible to decode response: "
                 + str(e)
                 + "\nResponse was: "
-                + str(req.text)
+                + body.decode("utf-8", "replace")
             )
             error_flag = True
+        if metrics is not None:
+            metrics.record_decode(endpoint, time.perf_counter() - start)
         if error_flag:
-            return None
+            return None, None
 
-        return json_output
+        return json_output, None
 
     def get_live(self):
         """Get current data."""
-        live_url = (
-            API_BASE_URI
-            + "/api/subscription/"
-            + self._user_id
-            + "/"
-            + self._user_reference
-            + API_ENDPOINT_LIVE
+        if self._live_cache is not None:
+            return self._live_cache.get(
+                (self._user_id, self._user_reference), self._fetch_live
+            )
+        return self._fetch_live()
+
+    def _fetch_live(self):
+        return self._get_info_from_server(
+            live_url(self._user_id, self._user_reference, self._base_uri),
+            endpoint=LIVE_ENDPOINT,
         )
 
-        return self._get_info_from_server(live_url)
+    def watch(
+        self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL, count=None,
+        ring=None
+    ):
+        """Get an iterator of live data, polled with an adaptive interval."""
+        return LiveWatcher(self, min_interval, max_interval, count, ring=ring)
 
     def get_consumption(self):
         """Get current data."""
-        consumption_url = (
-            API_BASE_URI
-            + "/apiV2/dataJSON/"
-            + self._user_id
-            + "/"
-            + self._user_reference
-            + "/3months"
+        return self._get_info_from_server(
+            consumption_url(self._user_id, self._user_reference, self._base_uri),
+            endpoint=CONSUMPTION_ENDPOINT,
         )
 
-        return self._get_info_from_server(consumption_url)
-
     def close_session(self):
         """Close current session."""
-        self._session.close()
-        self._session = None
+        with self._login_gate.lock:
+            self._cancel_refresh()
+            # a refresh timer already waiting on the lock must not log in again
+            self._login_gate.generation += 1
+            self._session.close()
+            self._session = None
@@ -0,0 +1,85 @@
+"""Flat CSV/NDJSON export of the daily consumption."""
+import csv
+import json
+
+# columns of one exported day, priceindex are kept as sent by the server
+FIELDS = (
+    "user_reference",
+    "time",
+    "totalConsumption",
+    "index1",
+    "bill1",
+    "priceindex1",
+    "index2",
+    "bill2",
+    "priceindex2",
+)
+FORMATS = ("csv", "ndjson")
+
+
+def iter_consumption_rows(payload, user_reference=None):
+    """Yield one tuple of FIELDS per day of a `get_consumption()` payload."""
+    if not payload:
+        return
+    for entry in payload.get("data", []):
+        consumption = entry.get("consumption") or {}
+        yield (
+            user_reference,
+            entry.get("time"),
+            entry.get("totalConsumption"),
+            consumption.get("index1"),
+            consumption.get("bill1"),
+            consumption.get("priceindex1"),
+            consumption.get("index2"),
+            consumption.get("bill2"),
+            consumption.get("priceindex2"),
+        )
+
+
+def write_csv(rows, out, header=True):
+    """Write rows as CSV lines, one at a time, and get the number written."""
+    writer = csv.writer(out, lineterminator="\n")
+    if header:
+        writer.writerow(FIELDS)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_ndjson(rows, out):
+    """Write rows as compact JSON objects, one per line, and get the number written."""
+    encoder = json.JSONEncoder(separators=(",", ":"))
+    count = 0
+    for row in rows:
+        out.write(encoder.encode(dict(zip(FIELDS, row))))
+        out.write("\n")
+        count += 1
+    return count
+
+
+class ConsumptionWriter(object):
+    """Write the consumption of one or several linky to one CSV/NDJSON output.
+
+    The CSV header is written once, before the first rows.
+    """
+
+    def __init__(self, out, output_format="csv"):
+        """Initialize the writer object."""
+        if output_format not in FORMATS:
+            raise ValueError("Format must be one of %s" % ", ".join(FORMATS))
+        self._out = out
+        self._format = output_format
+        self._header = output_format == "csv"
+
+    def write(self, payload, user_reference=None):
+        """Write every day of a payload and get the number of rows written."""
+        rows = iter_consumption_rows(payload, user_reference)
+        if self._format == "csv":
+            count = write_csv(rows, self._out, self._header)
+            self._header = False
+        else:
+            count = write_ndjson(rows, self._out)
+        self._out.flush()
+        return count
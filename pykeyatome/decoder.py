@@ -0,0 +1,18 @@
+"""Single-pass JSON decoding of the server responses."""
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional dependency
+    orjson = None  # type: ignore
+
+
+def loads(content):
+    """Decode a JSON body given as bytes.
+
+    orjson is used when installed, the standard library otherwise. Both raise
+    a ValueError subclass on invalid content.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
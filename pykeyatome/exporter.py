@@ -0,0 +1,211 @@
+"""Local http metrics endpoint fed by one logged-in client."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+import time
+
+from .watch import (
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    AdaptiveInterval,
+    reading_key,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9755
+DEFAULT_CONSUMPTION_INTERVAL = 3600
+METRICS_PATH = "/metrics"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# live field -> (metric name, help)
+LIVE_METRICS = (
+    ("last", "atome_live_power_watts", "Last instant power"),
+    ("filteredPower", "atome_live_filtered_power_watts", "Filtered instant power"),
+    ("subscribed", "atome_live_subscribed_power_va", "Subscribed power"),
+    ("isConnected", "atome_live_connected", "1 if the atome device is connected"),
+)
+# consumption field of the current day -> (metric name, help)
+CONSUMPTION_METRICS = (
+    ("totalConsumption", "atome_consumption_day_wh", "Consumption of the current day"),
+    ("index1", "atome_consumption_day_index1_wh", "Consumption of the day on index 1"),
+    ("index2", "atome_consumption_day_index2_wh", "Consumption of the day on index 2"),
+    ("bill1", "atome_consumption_day_bill1", "Bill of the day on index 1"),
+    ("bill2", "atome_consumption_day_bill2", "Bill of the day on index 2"),
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def render_metrics(user_reference, live, live_time, consumption, consumption_time, up):
+    """Render the latest data in the Prometheus text format."""
+    labels = '{user_reference="%s"}' % _escape(user_reference)
+    lines = []
+
+    def gauge(name, help_text, value, metric_labels=labels):
+        lines.append("# HELP %s %s" % (name, help_text))
+        lines.append("# TYPE %s gauge" % name)
+        lines.append("%s%s %s" % (name, metric_labels, _number(value)))
+
+    gauge("atome_up", "1 if the last poll of the server succeeded", up)
+    if live is not None:
+        for field, name, help_text in LIVE_METRICS:
+            if live.get(field) is not None:
+                gauge(name, help_text, live[field])
+        gauge(
+            "atome_live_updated_timestamp_seconds",
+            "Time of the last live poll",
+            live_time,
+        )
+    if consumption:
+        day = consumption[-1]
+        values = dict(
+            day.get("consumption", {}), totalConsumption=day.get("totalConsumption")
+        )
+        day_labels = '{user_reference="%s",day="%s"}' % (
+            _escape(user_reference),
+            _escape(day.get("time", "")[:10]),
+        )
+        for field, name, help_text in CONSUMPTION_METRICS:
+            if values.get(field) is not None:
+                gauge(name, help_text, values[field], day_labels)
+        gauge(
+            "atome_consumption_updated_timestamp_seconds",
+            "Time of the last consumption poll",
+            consumption_time,
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in (METRICS_PATH, "/"):
+            self.send_error(404)
+            return
+        # prebuilt on each poll, a scrape never calls the upstream server
+        body = self.server.exporter.get_page()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsExporter(object):
+    """Poll a logged-in client in background and serve the latest values.
+
+    Live data is polled with an adaptive interval (see `LiveWatcher`), the
+    consumption every consumption_interval seconds.
+    """
+
+    def __init__(
+        self,
+        client,
+        host=DEFAULT_HOST,
+        port=DEFAULT_PORT,
+        min_interval=DEFAULT_MIN_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        consumption_interval=DEFAULT_CONSUMPTION_INTERVAL,
+    ):
+        """Initialize the exporter object."""
+        self._client = client
+        self._interval = AdaptiveInterval(min_interval, max_interval)
+        self._consumption_interval = consumption_interval
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._live = None
+        self._live_time = None
+        self._consumption = None
+        self._consumption_time = None
+        self._up = False
+        self._page = render_metrics(
+            client.get_user_reference(), None, None, None, None, False
+        )
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self._server.exporter = self
+        self._threads = []
+
+    @property
+    def address(self):
+        """Get the (host, port) served."""
+        return self._server.server_address
+
+    def get_page(self):
+        """Get the current metrics page."""
+        return self._page
+
+    def _render(self):
+        with self._lock:
+            self._page = render_metrics(
+                self._client.get_user_reference(),
+                self._live,
+                self._live_time,
+                self._consumption,
+                self._consumption_time,
+                self._up,
+            )
+
+    def _poll_live(self):
+        last_key = None
+        while not self._stop.is_set():
+            reading = self._client.get_live()
+            changed = False
+            with self._lock:
+                self._up = reading is not None
+                if reading is not None:
+                    changed = reading_key(reading) != last_key
+                    last_key = reading_key(reading)
+                    self._live = reading
+                    self._live_time = time.time()
+            self._render()
+            self._stop.wait(self._interval.update(changed))
+
+    def _poll_consumption(self):
+        while not self._stop.is_set():
+            payload = self._client.get_consumption()
+            if payload is not None:
+                with self._lock:
+                    self._consumption = payload.get("data", [])
+                    self._consumption_time = time.time()
+                self._render()
+            self._stop.wait(self._consumption_interval)
+
+    def start(self):
+        """Start polling and serving in background threads."""
+        for target in (
+            self._poll_live,
+            self._poll_consumption,
+            self._server.serve_forever,
+        ):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        _LOGGER.debug("Serving metrics on http://%s:%s%s", *self.address, METRICS_PATH)
+        return self
+
+    def stop(self):
+        """Stop polling and serving, wait for the in-flight polls to end.
+
+        The client may be closed once this returns.
+        """
+        self._stop.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
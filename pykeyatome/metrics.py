@@ -0,0 +1,165 @@
+"""Per-request instrumentation of the atome clients."""
+import bisect
+import logging
+import threading
+
+# seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LOGIN_ENDPOINT = "login"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed bucket upper bounds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize the histogram object."""
+        self._buckets = tuple(buckets)
+        # last slot counts values above the last bucket
+        self._counts = [0] * (len(self._buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        """Add one value."""
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._sum += value
+
+    def get_dict(self):
+        """Get count, sum and cumulative count per upper bound."""
+        buckets = {}
+        cumulated = 0
+        for bound, count in zip(self._buckets, self._counts):
+            cumulated += count
+            buckets[bound] = cumulated
+        count = cumulated + self._counts[-1]
+        buckets[float("inf")] = count
+        return {"count": count, "sum": self._sum, "buckets": buckets}
+
+
+class _EndpointMetrics(object):
+    def __init__(self, buckets):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.latency = Histogram(buckets)
+        self.decode_time = Histogram(buckets)
+
+    def get_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "latency": self.latency.get_dict(),
+            "decode_time": self.decode_time.get_dict(),
+        }
+
+
+class ClientMetrics(object):
+    """Metrics of one or several clients, read by snapshot or callbacks.
+
+    Give an instance to `AtomeClient(..., metrics=metrics)`. Without it, the
+    client does not measure anything. Callbacks get one event dict per
+    measure, with an "event" key among "request", "decode", "retry",
+    "relogin" and "login". They are called in the thread of the request.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """Initialize the metrics object."""
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._relogins = 0
+        self._login_failures = 0
+        self._callbacks = []
+
+    def _endpoint(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics(self._buckets)
+        return metrics
+
+    def subscribe(self, callback):
+        """Call callback(event) on each measure."""
+        with self._lock:
+            self._callbacks = self._callbacks + [callback]
+
+    def unsubscribe(self, callback):
+        """Stop calling callback."""
+        with self._lock:
+            self._callbacks = [c for c in self._callbacks if c != callback]
+
+    def _emit(self, event):
+        for callback in self._callbacks:
+            try:
+                callback(event)
+            except Exception:  # a subscriber must not break a request
+                _LOGGER.exception("Metrics callback failed")
+
+    def record_request(self, endpoint, latency, status=None, bytes_received=0):
+        """Record one http request, status None on connection error."""
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.requests += 1
+            if status is None or status >= 400:
+                metrics.errors += 1
+            metrics.bytes_received += bytes_received
+            metrics.latency.observe(latency)
+        if self._callbacks:
+            self._emit(
+                {
+                    "event": "request",
+                    "endpoint": endpoint,
+                    "latency": latency,
+                    "status": status,
+                    "bytes_received": bytes_received,
+                }
+            )
+
+    def record_decode(self, endpoint, duration):
+        """Record the JSON decode time of one response."""
+        with self._lock:
+            self._endpoint(endpoint).decode_time.observe(duration)
+        if self._callbacks:
+            self._emit({"event": "decode", "endpoint": endpoint, "duration": duration})
+
+    def record_retry(self, endpoint):
+        """Record one retry of a request."""
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+        if self._callbacks:
+            self._emit({"event": "retry", "endpoint": endpoint})
+
+    def record_relogin(self):
+        """Record one relogin after a rejected session."""
+        with self._lock:
+            self._relogins += 1
+        if self._callbacks:
+            self._emit({"event": "relogin"})
+
+    def record_login(self, latency, success):
+        """Record one login request."""
+        with self._lock:
+            metrics = self._endpoint(LOGIN_ENDPOINT)
+            metrics.requests += 1
+            metrics.latency.observe(latency)
+            if not success:
+                metrics.errors += 1
+                self._login_failures += 1
+        if self._callbacks:
+            self._emit({"event": "login", "latency": latency, "success": success})
+
+    def snapshot(self):
+        """Get all the metrics as a dict."""
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: metrics.get_dict()
+                    for endpoint, metrics in self._endpoints.items()
+                },
+                "relogins": self._relogins,
+                "login_failures": self._login_failures,
+            }
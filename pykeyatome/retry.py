@@ -0,0 +1,77 @@
+"""Retry policy of the requests to the atome server."""
+import random
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 30
+DEFAULT_RETRY_STATUSES = (500, 502, 503, 504)
+
+# why a request may be retried
+RETRY_FORBIDDEN = "forbidden"
+RETRY_STATUS = "status"
+RETRY_TIMEOUT = "timeout"
+RETRY_CONNECTION = "connection"
+# the call deadline left no time for a request, never retried
+DEADLINE_EXCEEDED = "deadline"
+# failures telling the server is unreachable, not that the session is wrong
+OUTAGE_REASONS = frozenset((RETRY_STATUS, RETRY_TIMEOUT, RETRY_CONNECTION))
+
+
+class RetryPolicy(object):
+    """Which failures are retried, how long to wait, and the overall deadline.
+
+    A 403 is retried at once after a relogin. 5xx statuses, timeouts and
+    connection errors are retried after an exponential backoff
+    (backoff_base * 2 ** attempt, capped at backoff_max), with full jitter
+    unless jitter is False. deadline (seconds) bounds a whole call, retries
+    and waits included; requests are given the remaining time as timeout.
+    """
+
+    def __init__(
+        self,
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_base=DEFAULT_BACKOFF_BASE,
+        backoff_max=DEFAULT_BACKOFF_MAX,
+        jitter=True,
+        deadline=None,
+        retry_statuses=DEFAULT_RETRY_STATUSES,
+        retry_forbidden=True,
+        retry_timeout=True,
+        retry_connection=True,
+    ):
+        """Initialize the policy object."""
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self._retried = {
+            RETRY_FORBIDDEN: retry_forbidden,
+            RETRY_STATUS: True,
+            RETRY_TIMEOUT: retry_timeout,
+            RETRY_CONNECTION: retry_connection,
+        }
+        self._random = random.Random()
+
+    def classify_status(self, status):
+        """Get the retry reason of an http status, None if not retried."""
+        if status == 403:
+            return RETRY_FORBIDDEN
+        if status in self.retry_statuses:
+            return RETRY_STATUS
+        return None
+
+    def should_retry(self, reason, attempt):
+        """Tell if a failure of the given attempt (0 for the first) is retried."""
+        return attempt < self.max_retries and self._retried.get(reason, False)
+
+    def get_delay(self, reason, attempt):
+        """Get the wait in seconds before retrying the given attempt."""
+        if reason == RETRY_FORBIDDEN:
+            # the relogin already changed the state, no need to wait
+            return 0.0
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        if self.jitter:
+            delay = self._random.uniform(0, delay)
+        return delay
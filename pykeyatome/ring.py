@@ -0,0 +1,166 @@
+"""Bounded history of live readings with rolling window statistics."""
+from array import array
+from collections import deque
+import logging
+import threading
+import time
+
+from .timestamps import parse_timestamp
+
+DEFAULT_CAPACITY = 4096
+# seconds: 5 minutes and 1 hour
+DEFAULT_WINDOWS = (300, 3600)
+# live field -> name in the statistics
+RING_FIELDS = (("last", "last"), ("filteredPower", "filtered_power"))
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Window(object):
+    """Running sum and monotonic min/max queues over the samples of one window."""
+
+    def __init__(self, seconds, field_count):
+        self.seconds = seconds
+        self.start = 0  # sequence number of the oldest sample in the window
+        self.sums = [0.0] * field_count
+        self.minima = [deque() for _ in range(field_count)]
+        self.maxima = [deque() for _ in range(field_count)]
+
+
+class LiveRing(object):
+    """Fixed-size history of live samples (time, last, filteredPower).
+
+    Memory is bounded by capacity: the oldest sample is overwritten when the
+    buffer is full. Each window given at creation (in seconds) keeps a
+    running sum and monotonic min/max queues, so `get_stats` is O(1) and
+    `append` amortized O(1). Windows end at the time of the latest sample.
+    Thread safe, it can be filled by a watcher and read by another thread.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, windows=DEFAULT_WINDOWS):
+        """Initialize the ring object."""
+        if capacity < 1:
+            raise ValueError("Capacity must be at least 1")
+        self._capacity = capacity
+        self._times = array("d", [0.0]) * capacity
+        self._values = [array("d", [0.0]) * capacity for _ in RING_FIELDS]
+        # sequence number of the next sample, stored at next % capacity
+        self._next = 0
+        self._lock = threading.Lock()
+        self._windows = {
+            seconds: _Window(seconds, len(RING_FIELDS)) for seconds in windows
+        }
+
+    def __len__(self):
+        """Get the number of samples kept."""
+        return min(self._next, self._capacity)
+
+    def get_windows(self):
+        """Get the window lengths in seconds."""
+        return sorted(self._windows)
+
+    def _value(self, field, sequence):
+        return self._values[field][sequence % self._capacity]
+
+    def append(self, reading, now=None):
+        """Add a live reading, tell if it was kept.
+
+        The sample time is the reading "time", else now (epoch seconds),
+        else the current time. Readings without last or filteredPower, or
+        older than the latest sample, are ignored.
+        """
+        values = [reading.get(field) for field, _ in RING_FIELDS]
+        if any(value is None for value in values):
+            return False
+        if reading.get("time"):
+            moment = parse_timestamp(reading["time"])[0]
+        else:
+            moment = time.time() if now is None else now
+        with self._lock:
+            return self._append(values, moment)
+
+    def _append(self, values, moment):
+        if self._next and moment < self._times[(self._next - 1) % self._capacity]:
+            _LOGGER.debug("Ignore live reading older than the latest one")
+            return False
+
+        sequence = self._next
+        # the sample overwritten by this one, if the buffer is full
+        oldest = max(0, sequence + 1 - self._capacity)
+        for window in self._windows.values():
+            while window.start < sequence and (
+                window.start < oldest
+                or self._times[window.start % self._capacity] <= moment - window.seconds
+            ):
+                self._evict(window)
+
+        position = sequence % self._capacity
+        self._times[position] = moment
+        for field, value in enumerate(values):
+            self._values[field][position] = value
+        self._next += 1
+
+        for window in self._windows.values():
+            for field, value in enumerate(values):
+                window.sums[field] += value
+                minima = window.minima[field]
+                while minima and self._value(field, minima[-1]) >= value:
+                    minima.pop()
+                minima.append(sequence)
+                maxima = window.maxima[field]
+                while maxima and self._value(field, maxima[-1]) <= value:
+                    maxima.pop()
+                maxima.append(sequence)
+        return True
+
+    def _evict(self, window):
+        """Remove the oldest sample of a window."""
+        sequence = window.start
+        for field in range(len(RING_FIELDS)):
+            window.sums[field] -= self._value(field, sequence)
+            for queue in (window.minima[field], window.maxima[field]):
+                if queue and queue[0] == sequence:
+                    queue.popleft()
+        window.start += 1
+
+    def get_stats(self, window):
+        """Get count, sum, mean, min and max per field over one window.
+
+        Fields are "last" and "filtered_power", with None statistics while
+        the window is empty. The window must be one given at creation.
+        """
+        if window not in self._windows:
+            raise ValueError(
+                "Unknown window %s, use one of %s" % (window, self.get_windows())
+            )
+        with self._lock:
+            return self._get_stats(window)
+
+    def _get_stats(self, window):
+        state = self._windows[window]
+        count = self._next - state.start
+        stats = {"window": window, "count": count}
+        for field, (_, name) in enumerate(RING_FIELDS):
+            if count == 0:
+                stats[name] = {"sum": None, "mean": None, "min": None, "max": None}
+                continue
+            total = state.sums[field]
+            stats[name] = {
+                "sum": total,
+                "mean": total / count,
+                "min": self._value(field, state.minima[field][0]),
+                "max": self._value(field, state.maxima[field][0]),
+            }
+        return stats
+
+    def get_samples(self):
+        """Get the kept samples as (time, last, filteredPower), oldest first."""
+        with self._lock:
+            first = max(0, self._next - self._capacity)
+            return [
+                (self._times[sequence % self._capacity],)
+                + tuple(
+                    self._value(field, sequence) for field in range(len(RING_FIELDS))
+                )
+                for sequence in range(first, self._next)
+            ]
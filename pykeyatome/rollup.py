@@ -0,0 +1,104 @@
+"""Local week/month/year rollups of the daily consumption."""
+import datetime
+
+from .client import (
+    DAILY_PERIOD_TYPE,
+    MONTHLY_PERIOD_TYPE,
+    WEEKLY_PERIOD_TYPE,
+    YEARLY_PERIOD_TYPE,
+)
+from .series import new_column, np
+
+SUMMED_COLUMNS = ("total_consumption", "index1", "index2", "bill1", "bill2")
+
+_EPOCH = datetime.date(1970, 1, 1)
+_SECONDS_PER_DAY = 86400
+
+
+def _period_start(day, period):
+    """Get the first day of the period containing day."""
+    if period == DAILY_PERIOD_TYPE:
+        return day
+    if period == WEEKLY_PERIOD_TYPE:
+        return day - datetime.timedelta(days=day.weekday())
+    if period == MONTHLY_PERIOD_TYPE:
+        return day.replace(day=1)
+    if period == YEARLY_PERIOD_TYPE:
+        return day.replace(month=1, day=1)
+    raise ValueError("Unknown period type %s" % period)
+
+
+def _numpy_keys(series, period):
+    """Get the start of the period of each entry, as days since epoch."""
+    days = (np.asarray(series.time) + np.asarray(series.offset)) // _SECONDS_PER_DAY
+    if period == DAILY_PERIOD_TYPE:
+        return days
+    if period == WEEKLY_PERIOD_TYPE:
+        # 1970-01-01 is a Thursday, weeks start on Monday
+        return days - (days + 3) % 7
+    if period == MONTHLY_PERIOD_TYPE:
+        unit = "M"
+    elif period == YEARLY_PERIOD_TYPE:
+        unit = "Y"
+    else:
+        raise ValueError("Unknown period type %s" % period)
+    return (
+        days.astype("datetime64[D]")
+        .astype("datetime64[" + unit + "]")
+        .astype("datetime64[D]")
+    ).astype("int64")
+
+
+def _numpy_rollup(series, period):
+    keys, inverse = np.unique(_numpy_keys(series, period), return_inverse=True)
+    result = {
+        "period": [_EPOCH + datetime.timedelta(days=int(key)) for key in keys],
+        "days": np.bincount(inverse, minlength=len(keys)),
+    }
+    for name in SUMMED_COLUMNS:
+        column = np.asarray(getattr(series, name))
+        total = np.bincount(inverse, weights=column, minlength=len(keys))
+        result[name] = total.astype(column.dtype)
+    return result
+
+
+def _python_rollup(series, period):
+    groups = {}
+    for i in range(len(series)):
+        day = _EPOCH + datetime.timedelta(
+            days=(series.time[i] + series.offset[i]) // _SECONDS_PER_DAY
+        )
+        group = groups.setdefault(
+            _period_start(day, period), [0] + [0] * len(SUMMED_COLUMNS)
+        )
+        group[0] += 1
+        for j, name in enumerate(SUMMED_COLUMNS):
+            group[j + 1] += getattr(series, name)[i]
+    periods = sorted(groups)
+    result = {
+        "period": periods,
+        "days": new_column("time", [groups[p][0] for p in periods], False),
+    }
+    for j, name in enumerate(SUMMED_COLUMNS):
+        result[name] = new_column(name, [groups[p][j + 1] for p in periods], False)
+    return result
+
+
+def rollup(series, period):
+    """Sum a daily ConsumptionSeries by day, week, month or year.
+
+    Return a dict with `period` (list of first day of each period), `days`
+    (number of days found in each period) and the summed columns
+    `total_consumption`, `index1`, `index2`, `bill1` and `bill2`.
+    Periods are computed on the local date of each entry, weeks start on Monday.
+    """
+    if period not in (
+        DAILY_PERIOD_TYPE,
+        WEEKLY_PERIOD_TYPE,
+        MONTHLY_PERIOD_TYPE,
+        YEARLY_PERIOD_TYPE,
+    ):
+        raise ValueError("Unknown period type %s" % period)
+    if series.uses_numpy:
+        return _numpy_rollup(series, period)
+    return _python_rollup(series, period)
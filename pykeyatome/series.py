@@ -0,0 +1,107 @@
+"""Columnar representation of the daily consumption."""
+from array import array
+import datetime
+
+from .timestamps import parse_timestamps
+
+try:
+    import numpy as np
+except ImportError:  # numpy is an optional dependency
+    np = None  # type: ignore
+
+# column name -> (array typecode, numpy dtype)
+COLUMNS = {
+    "time": ("q", "int64"),  # epoch seconds
+    "offset": ("i", "int32"),  # utc offset in seconds
+    "total_consumption": ("q", "int64"),
+    "index1": ("q", "int64"),
+    "index2": ("q", "int64"),
+    "bill1": ("d", "float64"),
+    "bill2": ("d", "float64"),
+    "priceindex1": ("d", "float64"),
+    "priceindex2": ("d", "float64"),
+}
+
+
+def new_column(name, values, use_numpy=None):
+    """Build one contiguous column, numpy array if available else array.array."""
+    typecode, dtype = COLUMNS[name]
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy:
+        return np.asarray(values, dtype=dtype)
+    return array(typecode, values)
+
+
+class ConsumptionSeries(object):
+    """Daily consumption of one linky, stored as one array per field.
+
+    Attributes are `time` (epoch seconds), `offset` (utc offset in seconds),
+    `total_consumption`, `index1`, `index2`, `bill1`, `bill2`, `priceindex1`
+    and `priceindex2`. They are numpy arrays when numpy is installed,
+    `array.array` otherwise.
+    """
+
+    def __init__(self, columns):
+        """Initialize the series from a dict of columns of the same length."""
+        lengths = {len(columns[name]) for name in COLUMNS}
+        if len(lengths) > 1:
+            raise ValueError("Columns have different lengths")
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_json(cls, payload, use_numpy=None):
+        """Parse a `get_consumption()` payload."""
+        data = payload.get("data", [])
+        values = {name: [] for name in COLUMNS}
+        # one batched pass over the timestamps
+        values["time"], values["offset"] = parse_timestamps(
+            [entry["time"] for entry in data]
+        )
+        for entry in data:
+            consumption = entry.get("consumption", {})
+            values["total_consumption"].append(entry.get("totalConsumption", 0))
+            values["index1"].append(consumption.get("index1", 0))
+            values["index2"].append(consumption.get("index2", 0))
+            values["bill1"].append(consumption.get("bill1", 0.0))
+            values["bill2"].append(consumption.get("bill2", 0.0))
+            values["priceindex1"].append(float(consumption.get("priceindex1", 0.0)))
+            values["priceindex2"].append(float(consumption.get("priceindex2", 0.0)))
+        return cls(
+            {
+                name: new_column(name, column, use_numpy)
+                for name, column in values.items()
+            }
+        )
+
+    @property
+    def uses_numpy(self):
+        """Tell if columns are numpy arrays."""
+        return np is not None and isinstance(self.time, np.ndarray)
+
+    def __len__(self):
+        """Get the number of days."""
+        return len(self.time)
+
+    def to_list(self):
+        """Get back the list of entries, as returned by the server."""
+        entries = []
+        for i in range(len(self)):
+            offset = datetime.timezone(datetime.timedelta(seconds=int(self.offset[i])))
+            moment = datetime.datetime.fromtimestamp(int(self.time[i]), offset)
+            entries.append(
+                {
+                    "time": moment.isoformat(),
+                    "totalConsumption": int(self.total_consumption[i]),
+                    "consumption": {
+                        "index1": int(self.index1[i]),
+                        "bill1": float(self.bill1[i]),
+                        "priceindex1": "%.5f" % self.priceindex1[i],
+                        "index2": int(self.index2[i]),
+                        "bill2": float(self.bill2[i]),
+                        "priceindex2": "%.5f" % self.priceindex2[i],
+                    },
+                }
+            )
+        return entries
@@ -0,0 +1,80 @@
+"""Persistent store of the session cookies, to skip login on cold start."""
+from contextlib import contextmanager
+import json
+import logging
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows, only threads are locked out
+    fcntl = None  # type: ignore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FileSessionStore(object):
+    """PHPSESSID per username, in one JSON file shared by processes.
+
+    The file is created readable by its owner only. Writes are serialized
+    by a lock file (flock) and replace the file atomically.
+    """
+
+    def __init__(self, path):
+        """Initialize the store object."""
+        self._path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            fd = os.open(self._path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _read(self):
+        try:
+            with open(self._path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            _LOGGER.debug("Ignore unreadable session store: " + str(e))
+            return {}
+
+    def _write(self, sessions):
+        tmp_path = self._path + ".tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(sessions, f)
+        os.replace(tmp_path, self._path)
+
+    def load(self, username):
+        """Get (cookie, saved epoch time) of username, None if unknown."""
+        with self._locked():
+            entry = self._read().get(username)
+        if entry is None:
+            return None
+        return entry["cookie"], entry["saved"]
+
+    def save(self, username, cookie):
+        """Store the cookie of username."""
+        with self._locked():
+            sessions = self._read()
+            sessions[username] = {"cookie": cookie, "saved": time.time()}
+            self._write(sessions)
+
+    def delete(self, username):
+        """Forget the cookie of username."""
+        with self._locked():
+            sessions = self._read()
+            if sessions.pop(username, None) is not None:
+                self._write(sessions)
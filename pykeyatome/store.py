@@ -0,0 +1,135 @@
+"""Persistent store of daily consumption."""
+import datetime
+import json
+import logging
+import os
+import threading
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _day(entry):
+    """Get the local day (YYYY-MM-DD) of a consumption entry."""
+    return entry["time"][:10]
+
+
+def _as_day(value):
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()[:10]
+
+
+class ConsumptionStore(object):
+    """On-disk daily consumption history, one JSON file per linky.
+
+    Each `get_consumption()` payload is merged by its `time` key, so history
+    grows beyond the 3 months returned by the server, and the newest complete
+    day is remembered so that a poll can be skipped when nothing new is due.
+    """
+
+    def __init__(self, directory):
+        """Initialize the store object."""
+        self._directory = directory
+        self._lock = threading.Lock()
+        # (user_id, user_reference) -> {"last_complete_day": ..., "data": {day: entry}}
+        self._meters = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, user_id, user_reference):
+        return os.path.join(self._directory, "%s_%s.json" % (user_id, user_reference))
+
+    def _load(self, user_id, user_reference):
+        key = (user_id, user_reference)
+        meter = self._meters.get(key)
+        if meter is not None:
+            return meter
+        meter = {"last_complete_day": None, "data": {}}
+        try:
+            with open(self._path(user_id, user_reference), "r") as f:
+                content = json.load(f)
+            meter["last_complete_day"] = content["last_complete_day"]
+            meter["data"] = {_day(entry): entry for entry in content["data"]}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            _LOGGER.debug("Ignore unreadable consumption store: " + str(e))
+        self._meters[key] = meter
+        return meter
+
+    def _save(self, user_id, user_reference, meter):
+        path = self._path(user_id, user_reference)
+        content = {
+            "last_complete_day": meter["last_complete_day"],
+            "data": [meter["data"][day] for day in sorted(meter["data"])],
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(content, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def merge(self, user_id, user_reference, payload, today=None):
+        """Merge a consumption payload, return the number of new or changed days."""
+        if today is None:
+            today = datetime.date.today()
+        today = _as_day(today)
+        with self._lock:
+            meter = self._load(user_id, user_reference)
+            changed = 0
+            for entry in payload.get("data", []):
+                day = _day(entry)
+                if meter["data"].get(day) != entry:
+                    meter["data"][day] = entry
+                    changed += 1
+                # the entry of today is still growing
+                if day < today and (
+                    meter["last_complete_day"] is None
+                    or day > meter["last_complete_day"]
+                ):
+                    meter["last_complete_day"] = day
+            if changed:
+                self._save(user_id, user_reference, meter)
+            return changed
+
+    def get_last_complete_day(self, user_id, user_reference):
+        """Get the newest complete day stored (YYYY-MM-DD), None if empty."""
+        with self._lock:
+            return self._load(user_id, user_reference)["last_complete_day"]
+
+    def is_up_to_date(self, user_id, user_reference, today=None):
+        """Tell if yesterday is already stored as a complete day."""
+        if today is None:
+            today = datetime.date.today()
+        if isinstance(today, str):
+            today = datetime.date.fromisoformat(today)
+        last = self.get_last_complete_day(user_id, user_reference)
+        return (
+            last is not None
+            and last >= (today - datetime.timedelta(days=1)).isoformat()
+        )
+
+    def get_history(self, user_id, user_reference, start=None, end=None):
+        """Get stored entries, oldest first, between start and end days included."""
+        start = _as_day(start)
+        end = _as_day(end)
+        with self._lock:
+            data = self._load(user_id, user_reference)["data"]
+            return [
+                data[day]
+                for day in sorted(data)
+                if (start is None or day >= start) and (end is None or day <= end)
+            ]
+
+    def update(self, client, force=False):
+        """Fetch the consumption of a client if new days are due.
+
+        Return the number of new or changed days, 0 when skipped, None on error.
+        """
+        user_id = client._user_id
+        user_reference = client.get_user_reference()
+        if not force and self.is_up_to_date(user_id, user_reference):
+            _LOGGER.debug("Consumption store up to date, skip download")
+            return 0
+        payload = client.get_consumption()
+        if payload is None:
+            return None
+        return self.merge(user_id, user_reference, payload)
@@ -0,0 +1,69 @@
+"""Fast conversion of the server ISO-8601 timestamps to epoch seconds."""
+import datetime
+from functools import lru_cache
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# the server always sends "YYYY-MM-DDTHH:MM:SS+HH:MM"
+FIXED_FORMAT_LENGTH = 25
+
+
+@lru_cache(maxsize=4096)
+def _day_seconds(day):
+    """Get the epoch seconds of midnight UTC of a YYYY-MM-DD date."""
+    return (datetime.date.fromisoformat(day).toordinal() - EPOCH_ORDINAL) * 86400
+
+
+@lru_cache(maxsize=4096)
+def _time_seconds(time_of_day):
+    """Get the seconds since midnight of a HH:MM:SS time."""
+    moment = datetime.time.fromisoformat(time_of_day)
+    return moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+@lru_cache(maxsize=64)
+def _offset_seconds(offset):
+    """Get the seconds of a +HH:MM utc offset."""
+    hours, minutes = int(offset[1:3]), int(offset[4:6])
+    if offset[3] != ":" or hours > 23 or minutes > 59:
+        raise ValueError("Invalid utc offset: %r" % offset)
+    seconds = hours * 3600 + minutes * 60
+    return -seconds if offset[0] == "-" else seconds
+
+
+def _parse_slow(value):
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        raise ValueError("Timestamp without utc offset: %r" % value)
+    return int(moment.timestamp()), int(moment.utcoffset().total_seconds())
+
+
+def parse_timestamp(value):
+    """Get (epoch seconds, utc offset in seconds) of an ISO-8601 timestamp.
+
+    The fixed format of the server is parsed by parts, each part cached;
+    any other ISO-8601 form falls back to `datetime.fromisoformat`.
+    """
+    if len(value) == FIXED_FORMAT_LENGTH and value[10] == "T" and value[19] in "+-":
+        offset = _offset_seconds(value[19:])
+        return _day_seconds(value[:10]) + _time_seconds(value[11:19]) - offset, offset
+    return _parse_slow(value)
+
+
+def parse_timestamps(values):
+    """Get the lists of epoch seconds and utc offsets of a series of timestamps."""
+    epochs = []
+    offsets = []
+    add_epoch = epochs.append
+    add_offset = offsets.append
+    day_seconds = _day_seconds
+    time_seconds = _time_seconds
+    offset_seconds = _offset_seconds
+    for value in values:
+        if len(value) == FIXED_FORMAT_LENGTH and value[10] == "T" and value[19] in "+-":
+            offset = offset_seconds(value[19:])
+            add_epoch(day_seconds(value[:10]) + time_seconds(value[11:19]) - offset)
+        else:
+            epoch, offset = _parse_slow(value)
+            add_epoch(epoch)
+        add_offset(offset)
+    return epochs, offsets
@@ -0,0 +1,141 @@
+"""Pooled http transport shared by several atome clients."""
+import logging
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+# only one host is used by the API
+DEFAULT_POOL_CONNECTIONS = 1
+DEFAULT_POOL_MAXSIZE = 10
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TransportStats(object):
+    """Thread safe counters of the transport."""
+
+    def __init__(self):
+        """Initialize the counters."""
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._new_connections = 0
+
+    def request_sent(self):
+        """Count one request."""
+        with self._lock:
+            self._requests += 1
+
+    def connection_created(self):
+        """Count one new TCP (+TLS) handshake."""
+        with self._lock:
+            self._new_connections += 1
+
+    def get_dict(self):
+        """Get a snapshot of the counters."""
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "new_connections": self._new_connections,
+                "reused_connections": max(0, self._requests - self._new_connections),
+            }
+
+
+def _counting_pool(base, stats):
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            stats.connection_created()
+            return super().connect()
+
+    class CountingConnectionPool(base):
+        ConnectionCls = CountingConnection
+
+    return CountingConnectionPool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._stats),
+            "https": _counting_pool(HTTPSConnectionPool, self._stats),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self._stats.request_sent()
+        return super().send(request, *args, **kwargs)
+
+
+class _TransportSession(requests.Session):
+    """Session that leaves the shared pool open when it is closed."""
+
+    def __init__(self, adapter):
+        super().__init__()
+        self._shared_adapter = adapter
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def close(self):
+        for adapter in self.adapters.values():
+            if adapter is not self._shared_adapter:
+                adapter.close()
+
+
+class AtomeTransport(object):
+    """Connection pool that can be shared by several clients.
+
+    Each client still gets its own session (and so its own PHPSESSID cookie),
+    only the underlying connections are shared.
+    """
+
+    def __init__(
+        self,
+        pool_connections=DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        pool_block=False,
+        max_retries=0,
+        backoff_factor=0,
+        keep_alive=True,
+    ):
+        """Initialize the transport object.
+
+        max_retries are urllib3 retries of failed connections, done before
+        and on top of the RetryPolicy of the clients: they multiply its
+        attempts and are not bounded by its deadline. Read timeouts are
+        never retried here, so the clients still see them as timeouts.
+        """
+        self._keep_alive = keep_alive
+        self._stats = TransportStats()
+        self._adapter = _CountingHTTPAdapter(
+            self._stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=Retry(
+                total=max_retries,
+                read=False,
+                backoff_factor=backoff_factor,
+                raise_on_status=False,
+            ),
+        )
+
+    def new_session(self):
+        """Create a session using the shared connection pool."""
+        session = _TransportSession(self._adapter)
+        if not self._keep_alive:
+            session.headers.update({"Connection": "close"})
+        return session
+
+    def get_stats(self):
+        """Get connection reuse statistics."""
+        return self._stats.get_dict()
+
+    def close(self):
+        """Close every pooled connection."""
+        self._adapter.close()
@@ -0,0 +1,166 @@
+"""Continuous live polling with an adaptive interval."""
+import logging
+import time
+
+DEFAULT_MIN_INTERVAL = 5
+DEFAULT_MAX_INTERVAL = 60
+# interval growth when nothing changed
+BACKOFF_FACTOR = 1.5
+# weight of the last observed change period
+SMOOTHING = 0.3
+# fields of a live reading worth forwarding when they change
+CHANGE_FIELDS = ("last", "filteredPower", "isConnected")
+# delta key listing the removed fields
+REMOVED_KEY = "-"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def reading_key(reading):
+    """Get the part of a live reading that tells if the server updated it."""
+    return (reading.get("time"), reading.get("last"))
+
+
+def changes(readings, fields=CHANGE_FIELDS):
+    """Yield only the readings where one of fields changed since the last yielded."""
+    previous = None
+    for reading in readings:
+        values = tuple(reading.get(field) for field in fields)
+        if values != previous:
+            previous = values
+            yield reading
+
+
+def encode_delta(previous, current):
+    """Get the fields of current that differ from previous.
+
+    Removed fields are listed under the "-" key. With no previous reading,
+    current is returned as is.
+    """
+    if previous is None:
+        return dict(current)
+    delta = {
+        key: value
+        for key, value in current.items()
+        if key not in previous or previous[key] != value
+    }
+    removed = [key for key in previous if key not in current]
+    if removed:
+        delta[REMOVED_KEY] = removed
+    return delta
+
+
+def apply_delta(previous, delta):
+    """Rebuild a reading from the previous one and its delta."""
+    current = dict(previous or {})
+    for key in delta.get(REMOVED_KEY, ()):
+        current.pop(key, None)
+    current.update((key, value) for key, value in delta.items() if key != REMOVED_KEY)
+    return current
+
+
+def deltas(readings):
+    """Yield the delta encoding of a stream of readings, the first one in full."""
+    previous = None
+    for reading in readings:
+        yield encode_delta(previous, reading)
+        previous = reading
+
+
+class AdaptiveInterval(object):
+    """Polling interval following the update period of the server.
+
+    After a change, the next poll is planned one estimated update period later.
+    While nothing changes, the interval grows up to max_interval.
+    """
+
+    def __init__(
+        self, min_interval=DEFAULT_MIN_INTERVAL, max_interval=DEFAULT_MAX_INTERVAL
+    ):
+        """Initialize the interval object."""
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._estimate = None
+        self._last_change = None
+
+    def _clamp(self, value):
+        return max(self.min_interval, min(self.max_interval, value))
+
+    def update(self, changed, now=None):
+        """Give the result of a poll, get the next interval in seconds."""
+        if now is None:
+            now = time.monotonic()
+        if changed:
+            if self._last_change is not None:
+                period = now - self._last_change
+                if self._estimate is None:
+                    self._estimate = period
+                else:
+                    self._estimate += SMOOTHING * (period - self._estimate)
+            self._last_change = now
+            if self._estimate is not None:
+                self.interval = self._clamp(self._estimate)
+        else:
+            self.interval = self._clamp(self.interval * BACKOFF_FACTOR)
+        return self.interval
+
+
+class LiveWatcher(object):
+    """Iterate over live readings of a logged client, on one session.
+
+    Give a `LiveRing` as ring to keep each new reading in it.
+    """
+
+    def __init__(
+        self,
+        client,
+        min_interval=DEFAULT_MIN_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        count=None,
+        sleep=time.sleep,
+        ring=None,
+    ):
+        """Initialize the watcher object."""
+        self._client = client
+        self._ring = ring
+        self._interval = AdaptiveInterval(min_interval, max_interval)
+        self._count = count
+        self._sleep = sleep
+        self._last_key = None
+        self._running = True
+
+    def stop(self):
+        """Stop the iteration after the current poll."""
+        self._running = False
+
+    def get_ring(self):
+        """Get the ring of the readings, None if not kept."""
+        return self._ring
+
+    def get_interval(self):
+        """Get the current polling interval in seconds."""
+        return self._interval.interval
+
+    def __iter__(self):
+        """Yield each successful live reading."""
+        emitted = 0
+        while self._running and (self._count is None or emitted < self._count):
+            reading = self._client.get_live()
+            if reading is None:
+                _LOGGER.debug("No live data, back off")
+                changed = False
+            else:
+                key = reading_key(reading)
+                changed = key != self._last_key
+                self._last_key = key
+                if changed and self._ring is not None:
+                    # a repeated reading is the same sample
+                    self._ring.append(reading)
+                emitted += 1
+                yield reading
+                if not self._running or (
+                    self._count is not None and emitted >= self._count
+                ):
+                    return
+            self._sleep(self._interval.update(changed))
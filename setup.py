@@ -15,6 +15,7 @@ setuptools.setup(
     url="http://github.com/jugla/pyKeyAtome/",
     packages=setuptools.find_packages(include=["pykeyatome"]),
     setup_requires=["requests", "setuptools"],
-    install_requires=["requests", "fake_useragent", "simplejson"],
+    install_requires=["requests", "fake_useragent"],
+    extras_require={"async": ["aiohttp"], "numpy": ["numpy"], "fast": ["orjson"]},
     entry_points={"console_scripts": ["pykeyatome = pykeyatome.__main__:main"]},
 )
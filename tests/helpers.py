@@ -0,0 +1,86 @@
+"""Shared fixtures of the tests."""
+import datetime
+import json
+import os
+
+import responses
+
+from pykeyatome.client import LOGIN_URL
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def load_bytes(name):
+    """Get the raw content of a file of tests/data."""
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return f.read()
+
+
+def load_json(name):
+    """Get the decoded content of a JSON file of tests/data."""
+    with open(os.path.join(DATA_DIR, name), "r") as f:
+        return json.load(f)
+
+
+def add_login(cookie="TEST"):
+    """Answer the login with a PHPSESSID, responses must be active."""
+    responses.add(
+        responses.POST,
+        LOGIN_URL,
+        headers={"Set-Cookie": "PHPSESSID=%s; path=/" % cookie},
+        body="{}",
+    )
+
+
+def daily_payload(first_day, days, consumption):
+    """Build a `get_consumption()` payload with the same consumption each day.
+
+    consumption holds index1, bill1, priceindex1, index2, bill2 and
+    priceindex2, totalConsumption is index1 + index2.
+    """
+    data = []
+    for i in range(days):
+        day = first_day + datetime.timedelta(days=i)
+        data.append(
+            {
+                "time": day.isoformat() + "T00:00:00+01:00",
+                "totalConsumption": consumption["index1"] + consumption["index2"],
+                "consumption": dict(consumption),
+            }
+        )
+    return {"data": data}
+
+
+class FakeClient(object):
+    """Stand-in of a logged AtomeClient serving canned data.
+
+    live is a list of readings served in turn, or one reading served on
+    every call. Calls are counted in live_calls and consumption_calls.
+    """
+
+    def __init__(
+        self, live=None, consumption=None, user_id="12345", user_reference="101234567"
+    ):
+        """Initialize the client object."""
+        self._user_id = user_id
+        self._user_reference = user_reference
+        self.live = live
+        self.consumption = consumption
+        self.live_calls = 0
+        self.consumption_calls = 0
+
+    def get_user_reference(self):
+        """Get the user reference."""
+        return self._user_reference
+
+    def get_live(self):
+        """Get the next live reading."""
+        self.live_calls += 1
+        if isinstance(self.live, list):
+            return self.live.pop(0)
+        return self.live
+
+    def get_consumption(self):
+        """Get the consumption payload."""
+        self.consumption_calls += 1
+        return self.consumption
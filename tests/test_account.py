@@ -0,0 +1,56 @@
+"""Module used to test the account library."""
+import unittest
+
+import responses
+
+from pykeyatome.account import AtomeAccountClient
+from pykeyatome.client import LOGIN_URL, consumption_url, live_url
+
+from .helpers import add_login, load_json
+
+
+class AtomeAccountClientTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    @responses.activate
+    def test_fan_out(self):
+        """Login once and fetch every linky."""
+        references = ["101234567", "101234568", "101234569"]
+        add_login()
+        for index, reference in enumerate(references):
+            live = load_json("live.json")
+            live["last"] = index
+            responses.add(responses.GET, live_url("12345", reference), json=live)
+            responses.add(
+                responses.GET,
+                consumption_url("12345", reference),
+                json=load_json("3months.json"),
+            )
+
+        account = AtomeAccountClient("test_login", "test_password", "12345", references)
+        assert account.login() == {"user_id": "12345", "user_references": references}
+
+        lives = account.get_live()
+        assert {reference: data["last"] for reference, data in lives.items()} == {
+            "101234567": 0,
+            "101234568": 1,
+            "101234569": 2,
+        }
+        consumptions = account.get_consumption()
+        assert set(consumptions) == set(references)
+
+        login_calls = [
+            call for call in responses.calls if call.request.url == LOGIN_URL
+        ]
+        assert len(login_calls) == 1
+        sessions = {
+            id(account.get_client(reference)._session) for reference in references
+        }
+        assert len(sessions) == 1
+
+        account.close_session()
+        assert account.get_client(references[1])._session is None
+
+
+if __name__ == "__main__":
+    unittest.main()
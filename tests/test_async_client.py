@@ -0,0 +1,163 @@
+"""Module used to test asyncio library."""
+import asyncio
+import unittest
+
+from pykeyatome.async_client import AsyncAtomeClient
+from pykeyatome.breaker import STATE_HALF_OPEN, CircuitBreaker
+from pykeyatome.client import LOGIN_URL, consumption_url, live_url
+from pykeyatome.retry import RetryPolicy
+
+from .helpers import load_bytes
+
+
+class _Cookie(object):
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+
+class _Response(object):
+    def __init__(self, status, body, delay=0):
+        self.status = status
+        self._body = body
+        self._delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def read(self):
+        # let concurrent requests interleave
+        await asyncio.sleep(self._delay)
+        return self._body
+
+
+class FakeSession(object):
+    """Minimal aiohttp.ClientSession stand-in serving canned answers."""
+
+    def __init__(self, answers):
+        """Initialize the session object."""
+        self.answers = answers
+        self.cookie_jar = []
+        self.calls = []
+        self.post_timeouts = []
+        self.expired = False
+        self.delay = 0
+
+    def post(self, url, **kwargs):
+        """Login, setting the PHPSESSID cookie."""
+        self.calls.append(("POST", url))
+        self.post_timeouts.append(kwargs.get("timeout"))
+        self.cookie_jar = [_Cookie("PHPSESSID", "TEST")]
+        self.expired = False
+        return _Response(200, load_bytes("login.json"))
+
+    def get(self, url, **kwargs):
+        """Answer the canned response of url, 403 once expired."""
+        self.calls.append(("GET", url))
+        if self.expired:
+            return _Response(403, b"Wrong session")
+        status, body = self.answers[url]
+        return _Response(status, body, self.delay)
+
+    async def close(self):
+        """Close the session."""
+        pass
+
+
+class AsyncAtomeClientTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def _client(self, answers):
+        session = FakeSession(answers)
+        client = AsyncAtomeClient(
+            "test_login", "test_password", "12345", "101234567", session=session
+        )
+        return client, session
+
+    def test_login(self):
+        """Test login with cookie."""
+        client, session = self._client({})
+        result = asyncio.run(client.login())
+        assert result == {"user_id": "12345", "user_reference": "101234567"}
+        assert session.calls == [("POST", LOGIN_URL)]
+
+    def test_get_live(self):
+        """Retrieve live."""
+        url = live_url("12345", "101234567")
+        client, _ = self._client({url: (200, load_bytes("live.json"))})
+        assert asyncio.run(client.get_live())["last"] == 2289
+
+    def test_consumption(self):
+        """Retrieve consumption."""
+        url = consumption_url("12345", "101234567")
+        client, _ = self._client({url: (200, load_bytes("3months.json"))})
+        data = asyncio.run(client.get_consumption())
+        assert data["data"][-1]["totalConsumption"] == 12327
+
+    def test_relog_after_session_down(self):
+        """Relog on every retried 403 until max retries is exceeded."""
+        url = live_url("12345", "101234567")
+        client, session = self._client({url: (403, b"Wrong session")})
+        assert asyncio.run(client.get_live()) is None
+        assert session.calls.count(("GET", url)) == 4
+        assert session.calls.count(("POST", LOGIN_URL)) == 3
+
+    def test_retry_server_error(self):
+        """5xx are retried after a backoff."""
+        url = live_url("12345", "101234567")
+        client, session = self._client({url: (503, b"")})
+        client._retry_policy = RetryPolicy(
+            max_retries=2, backoff_base=0.001, jitter=False
+        )
+        assert asyncio.run(client.get_live()) is None
+        assert session.calls.count(("GET", url)) == 3
+        assert session.calls.count(("POST", LOGIN_URL)) == 0
+
+    def test_single_flight_relogin(self):
+        """Concurrent 403 trigger a single login."""
+        url = live_url("12345", "101234567")
+        client, session = self._client({url: (200, load_bytes("live.json"))})
+
+        async def poll():
+            await client.login()
+            session.expired = True
+            return await asyncio.gather(*(client.get_live() for _ in range(5)))
+
+        results = asyncio.run(poll())
+        assert [result["last"] for result in results] == [2289] * 5
+        assert session.calls.count(("POST", LOGIN_URL)) == 2
+
+    def test_relogin_within_deadline(self):
+        """The relogin after a 403 is bounded by the call deadline."""
+        url = live_url("12345", "101234567")
+        client, session = self._client({url: (200, load_bytes("live.json"))})
+        client._retry_policy = RetryPolicy(deadline=2)
+        session.expired = True
+        assert asyncio.run(client.get_live())["last"] == 2289
+        assert 0 < session.post_timeouts[-1].total <= 2
+
+    def test_cancelled_probe(self):
+        """A cancelled probe does not keep the circuit half open."""
+        url = live_url("12345", "101234567")
+        client, session = self._client({url: (200, load_bytes("live.json"))})
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        client._circuit_breaker = breaker
+        session.delay = 1
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(asyncio.wait_for(client.get_live(), 0.05))
+        assert breaker.get_state() == STATE_HALF_OPEN
+        assert breaker.allow_request()
+
+    def test_bad_json(self):
+        """Undecodable payload returns None."""
+        url = live_url("12345", "101234567")
+        client, _ = self._client({url: (200, b"{not json")})
+        assert asyncio.run(client.get_live()) is None
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""Module used to test the batch polling."""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from urllib.parse import parse_qs
+
+import responses
+
+from pykeyatome.batch import iter_batch, load_accounts
+from pykeyatome.client import LOGIN_URL, live_url
+
+from .helpers import add_login
+
+
+class BatchTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Write a config file."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "accounts.json")
+        config = {
+            "accounts": [
+                {
+                    "username": "a",
+                    "password": "pa",
+                    "user_id": 1,
+                    "user_references": ["11", "12"],
+                },
+                {
+                    "username": "b",
+                    "password": "pb",
+                    "user_id": "2",
+                    "user_reference": "21",
+                },
+                {
+                    "username": "c",
+                    "password": "wrong",
+                    "user_id": "3",
+                    "user_reference": "31",
+                },
+            ]
+        }
+        with open(self.path, "w") as f:
+            json.dump(config, f)
+
+    def tearDown(self):
+        """Remove the config file."""
+        shutil.rmtree(self.directory)
+
+    def test_load_accounts(self):
+        """References are normalized to a list of strings."""
+        accounts = load_accounts(self.path)
+        assert [account["user_references"] for account in accounts] == [
+            ["11", "12"],
+            ["21"],
+            ["31"],
+        ]
+        assert accounts[0]["user_id"] == "1"
+        with open(self.path, "w") as f:
+            json.dump([{"username": "a", "password": "pa", "user_id": "1"}], f)
+        with self.assertRaises(ValueError):
+            load_accounts(self.path)
+
+    @responses.activate
+    def test_iter_batch(self):
+        """One record per linky, errors included, one login per account."""
+
+        def login_callback(request):
+            form = parse_qs(request.body)
+            if form["_password"][0] == "wrong":
+                return (200, {}, "{}")
+            return (
+                200,
+                {"Set-Cookie": "PHPSESSID=%s; path=/" % form["_username"][0]},
+                "{}",
+            )
+
+        responses.add_callback(responses.POST, LOGIN_URL, callback=login_callback)
+        for user_id, reference in (("1", "11"), ("1", "12"), ("2", "21")):
+            responses.add(
+                responses.GET,
+                live_url(user_id, reference),
+                json={"last": int(reference)},
+            )
+
+        records = list(iter_batch(load_accounts(self.path), "live", max_workers=2))
+        by_reference = {record["user_reference"]: record for record in records}
+        assert len(records) == 4
+        assert by_reference["11"]["data"] == {"last": 11}
+        assert by_reference["12"]["data"] == {"last": 12}
+        assert by_reference["21"] == {
+            "username": "b",
+            "user_id": "2",
+            "user_reference": "21",
+            "data": {"last": 21},
+        }
+        assert by_reference["31"]["error"] == "login failed"
+        login_calls = [
+            call for call in responses.calls if call.request.url == LOGIN_URL
+        ]
+        assert len(login_calls) == 3
+
+    @responses.activate
+    def test_linky_streamed(self):
+        """A linky is yielded before the next one of its account is fetched."""
+        received = threading.Event()
+        waited = []
+
+        def second_callback(request):
+            waited.append(received.wait(5))
+            return (200, {}, '{"last": 12}')
+
+        add_login()
+        responses.add(responses.GET, live_url("1", "11"), json={"last": 11})
+        responses.add_callback(
+            responses.GET, live_url("1", "12"), callback=second_callback
+        )
+
+        records = iter_batch(load_accounts(self.path)[:1], "live")
+        assert next(records)["user_reference"] == "11"
+        received.set()
+        assert [record["data"] for record in records] == [{"last": 12}]
+        assert waited == [True]
+
+    @responses.activate
+    def test_early_close(self):
+        """Closing the records skips the accounts not polled yet."""
+        add_login()
+        accounts = []
+        for i in range(20):
+            reference = str(100 + i)
+            accounts.append(
+                {
+                    "username": "user%s" % i,
+                    "password": "p",
+                    "user_id": "1",
+                    "user_references": [reference],
+                }
+            )
+            responses.add(responses.GET, live_url("1", reference), json={"last": i})
+
+        records = iter_batch(accounts, "live", max_workers=1)
+        next(records)
+        records.close()
+        login_calls = [
+            call for call in responses.calls if call.request.url == LOGIN_URL
+        ]
+        assert len(login_calls) < 20
+
+    def test_iter_batch_action(self):
+        """Only live and consumption are polled in batch."""
+        with self.assertRaises(ValueError):
+            list(iter_batch([], "watch"))
+
+
+if __name__ == "__main__":
+    unittest.main()
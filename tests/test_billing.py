@@ -0,0 +1,87 @@
+"""Module used to test the billing engine."""
+import datetime
+import unittest
+
+from pykeyatome.billing import Tariff, TariffSchedule, reprice, reprice_many
+from pykeyatome.client import MONTHLY_PERIOD_TYPE
+from pykeyatome.rollup import rollup
+from pykeyatome.series import ConsumptionSeries, np
+
+from .helpers import daily_payload
+
+DAY = {
+    "index1": 1000,
+    "bill1": 0.176,
+    "priceindex1": "0.17600",
+    "index2": 2000,
+    "bill2": 0.42136,
+    "priceindex2": "0.21068",
+}
+
+SCHEDULE = TariffSchedule(
+    [
+        (datetime.date(2022, 2, 1), Tariff(0.25)),
+        (datetime.date(2022, 1, 1), Tariff(0.1, 0.2)),
+    ]
+)
+
+
+class BillingTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def _check(self, use_numpy):
+        series = ConsumptionSeries.from_json(
+            daily_payload(datetime.date(2022, 1, 30), 4, DAY), use_numpy=use_numpy
+        )
+        billed = reprice(series, SCHEDULE)
+        assert list(billed.priceindex1) == [0.1, 0.1, 0.25, 0.25]
+        assert list(billed.priceindex2) == [0.2, 0.2, 0.25, 0.25]
+        assert list(billed.bill1) == [0.1, 0.1, 0.25, 0.25]
+        assert list(billed.bill2) == [0.4, 0.4, 0.5, 0.5]
+        # the original is left untouched
+        assert series.bill1[0] == 0.176
+        assert list(billed.index1) == list(series.index1)
+
+        monthly = rollup(billed, MONTHLY_PERIOD_TYPE)
+        assert [round(float(bill), 6) for bill in monthly["bill2"]] == [0.8, 1.0]
+
+        other = ConsumptionSeries.from_json(
+            daily_payload(datetime.date(2022, 2, 10), 2, DAY), use_numpy=use_numpy
+        )
+        first, second = reprice_many([series, other], SCHEDULE)
+        assert list(first.bill2) == list(billed.bill2)
+        assert list(second.bill1) == [0.25, 0.25]
+
+        with self.assertRaises(ValueError):
+            reprice(
+                ConsumptionSeries.from_json(
+                    daily_payload(datetime.date(2021, 12, 31), 2, DAY),
+                    use_numpy=use_numpy,
+                ),
+                SCHEDULE,
+            )
+
+    def test_python(self):
+        """Reprice with array.array."""
+        self._check(False)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy(self):
+        """Reprice with numpy."""
+        self._check(True)
+
+    def test_schedule(self):
+        """A schedule needs distinct start dates."""
+        with self.assertRaises(ValueError):
+            TariffSchedule([])
+        with self.assertRaises(ValueError):
+            TariffSchedule(
+                [
+                    (datetime.date(2022, 1, 1), Tariff(0.1)),
+                    (datetime.date(2022, 1, 1), Tariff(0.2)),
+                ]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Module used to test the circuit breaker."""
+import time
+import unittest
+
+import responses
+
+from pykeyatome.breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from pykeyatome.client import AtomeClient, live_url
+from pykeyatome.retry import RetryPolicy
+
+from .helpers import add_login
+
+URL = live_url("12345", "101234567")
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_states(self):
+        """Closed, open, half open, then closed or open again."""
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.get_state() == STATE_CLOSED
+        breaker.record_failure()
+        assert breaker.get_state() == STATE_OPEN
+        assert not breaker.allow_request()
+
+        time.sleep(0.06)
+        assert breaker.get_state() == STATE_HALF_OPEN
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.get_state() == STATE_OPEN
+
+        time.sleep(0.06)
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.get_dict() == {"state": STATE_CLOSED, "failures": 0}
+
+    def test_for_host(self):
+        """One breaker per host."""
+        assert CircuitBreaker.for_host("a.test") is CircuitBreaker.for_host("a.test")
+        assert CircuitBreaker.for_host("a.test") is not CircuitBreaker.for_host(
+            "b.test"
+        )
+        breaker = CircuitBreaker.for_host("c.test", failure_threshold=2)
+        assert CircuitBreaker.for_host("c.test", failure_threshold=2) is breaker
+        with self.assertRaises(ValueError):
+            CircuitBreaker.for_host("c.test", failure_threshold=3)
+
+    @responses.activate
+    def test_client_fails_fast(self):
+        """An open circuit stops the requests."""
+        add_login()
+        responses.add(responses.GET, URL, status=503)
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+        client = AtomeClient(
+            "test_login",
+            "test_password",
+            "12345",
+            "101234567",
+            retry_policy=RetryPolicy(max_retries=5, backoff_base=0, jitter=False),
+            circuit_breaker=breaker,
+        )
+        client.login()
+        assert client.get_circuit_state() == STATE_CLOSED
+        assert client.get_live() is None
+        assert client.get_circuit_state() == STATE_OPEN
+        assert client.get_live() is None
+        assert len([call for call in responses.calls if call.request.url == URL]) == 3
+
+    @responses.activate
+    def test_probe_released(self):
+        """A probe that got no answer does not keep the circuit half open."""
+        add_login()
+        responses.add(responses.GET, URL, body=RuntimeError("boom"))
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        client = AtomeClient(
+            "test_login", "test_password", "12345", "101234567", circuit_breaker=breaker
+        )
+        client.login()
+        with self.assertRaises(RuntimeError):
+            client.get_live()
+        assert breaker.get_state() == STATE_HALF_OPEN
+        assert breaker.allow_request()
+
+
+if __name__ == "__main__":
+    unittest.main()
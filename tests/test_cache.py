@@ -0,0 +1,95 @@
+"""Module used to test the live cache."""
+import threading
+import time
+import unittest
+
+from pykeyatome.cache import LiveCache
+
+
+class _Fetcher(object):
+    def __init__(self):
+        self.calls = 0
+        self.done = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.done.set()
+        return {"last": self.calls}
+
+
+class LiveCacheTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_fresh_hit(self):
+        """Fresh entries are served from memory."""
+        cache = LiveCache(ttl=60)
+        fetch = _Fetcher()
+        assert cache.get(("1", "a"), fetch) == {"last": 1}
+        assert cache.get(("1", "a"), fetch) == {"last": 1}
+        assert fetch.calls == 1
+
+    def test_stale_while_revalidate(self):
+        """Stale entries are served while refreshed in background."""
+        cache = LiveCache(ttl=0.05, stale_ttl=60)
+        fetch = _Fetcher()
+        cache.get(("1", "a"), fetch)
+        time.sleep(0.1)
+        fetch.done.clear()
+        assert cache.get(("1", "a"), fetch) == {"last": 1}
+        assert fetch.done.wait(5)
+        time.sleep(0.05)
+        assert cache.get(("1", "a"), fetch) == {"last": 2}
+
+    def test_expired(self):
+        """Too old entries are fetched synchronously."""
+        cache = LiveCache(ttl=0, stale_ttl=0)
+        fetch = _Fetcher()
+        cache.get(("1", "a"), fetch)
+        assert cache.get(("1", "a"), fetch) == {"last": 2}
+
+    def test_lru_eviction(self):
+        """Least recently used entries are evicted."""
+        cache = LiveCache(ttl=60, maxsize=2)
+        fetch = _Fetcher()
+        cache.get("a", fetch)
+        cache.get("b", fetch)
+        cache.get("a", fetch)
+        cache.get("c", fetch)
+        assert len(cache) == 2
+        assert cache.get("a", fetch) == {"last": 1}
+        assert cache.get("b", fetch) == {"last": 4}
+
+    def test_single_flight(self):
+        """Concurrent cold reads share one fetch."""
+        cache = LiveCache(ttl=60)
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return {"last": len(calls)}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("a", fetch)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        assert results == [{"last": 1}] * 10
+        assert len(calls) == 1
+
+    def test_failure_not_cached(self):
+        """None is never cached."""
+        cache = LiveCache(ttl=60)
+        assert cache.get("a", lambda: None) is None
+        assert len(cache) == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,10 @@ import json
 import logging
 import os
 import sys
+import threading
+import time
 import unittest
+from unittest import mock
 
 import requests
 import requests_mock
@@ -16,8 +19,12 @@ from pykeyatome.client import (
     API_ENDPOINT_LIVE,
     LOGIN_URL,
     AtomeClient,
+    _user_agent_factory,
+    live_url,
 )
 
+from .helpers import add_login
+
 # You must initialize logging, otherwise you'll not see debug output.
 logging.basicConfig()
 logging.getLogger().setLevel(logging.DEBUG)
@@ -187,5 +194,121 @@ class AtomeClientTestCase(unittest.TestCase):
             assert False
 
 
+class AtomeClientReloginTestCase(unittest.TestCase):
+    """Class used to test relogin."""
+
+    @responses.activate
+    def test_single_flight_relogin(self):
+        """Concurrent 403 trigger a single login."""
+        callers = 5
+        state = {"logins": 0, "valid": None}
+        barrier = threading.Barrier(callers)
+
+        def login_callback(request):
+            state["logins"] += 1
+            state["valid"] = "S%d" % state["logins"]
+            return (200, {"Set-Cookie": "PHPSESSID=%s; path=/" % state["valid"]}, "{}")
+
+        def live_callback(request):
+            if request.headers.get("Cookie") != "PHPSESSID=%s" % state["valid"]:
+                barrier.wait(timeout=5)
+                return (403, {}, "Wrong session")
+            return (200, {}, json.dumps({"last": 2289}))
+
+        responses.add_callback(responses.POST, LOGIN_URL, callback=login_callback)
+        responses.add_callback(
+            responses.GET, live_url("12345", "101234567"), callback=live_callback
+        )
+
+        client = AtomeClient("test_login", "test_password", "12345", "101234567")
+        client.login()
+        # the server drops the session
+        state["valid"] = None
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.get_live()))
+            for _ in range(callers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert [result["last"] for result in results] == [2289] * callers
+        assert state["logins"] == 2
+
+    @responses.activate
+    def test_session_lifetime_observed(self):
+        """A 403 on an old session gives its lifetime."""
+        add_login()
+        url = live_url("12345", "101234567")
+        responses.add(responses.GET, url, status=403, body="Wrong session")
+        responses.add(responses.GET, url, json={"last": 2289})
+
+        client = AtomeClient("test_login", "test_password", "12345", "101234567")
+        client.login()
+        assert client.get_session_lifetime() is None
+        client._session_started -= 600
+        assert client.get_live()["last"] == 2289
+        assert 600 <= client.get_session_lifetime() < 610
+        assert client.get_session_age() < 10
+
+    @responses.activate
+    def test_user_agent(self):
+        """A given user-agent is used, else a random one per new session."""
+        add_login()
+        client = AtomeClient("test_login", "test_password", "12345", "101234567", user_agent="UA")
+        client.login()
+        assert responses.calls[0].request.headers["User-agent"] == "UA"
+
+        with mock.patch("fake_useragent.UserAgent") as user_agent:
+            type(user_agent.return_value).random = mock.PropertyMock(
+                side_effect=["RANDOM1", "RANDOM2"]
+            )
+            _user_agent_factory.cache_clear()
+            for expected in ("RANDOM1", "RANDOM2"):
+                client = AtomeClient("test_login", "test_password", "12345", "101234567")
+                client.login()
+                assert responses.calls[-1].request.headers["User-agent"] == expected
+            # the generator is built once
+            assert user_agent.call_count == 1
+        _user_agent_factory.cache_clear()
+
+    @responses.activate
+    def test_proactive_refresh(self):
+        """The session is renewed in background before it expires."""
+        add_login()
+        client = AtomeClient(
+            "test_login", "test_password", "12345", "101234567",
+            session_refresh=True, session_lifetime=0.1,
+        )
+        client.login()
+        time.sleep(0.3)
+        client.close_session()
+        logins = len(responses.calls)
+        assert logins >= 3
+        time.sleep(0.2)
+        assert len(responses.calls) == logins
+
+    @responses.activate
+    def test_close_with_pending_refresh(self):
+        """A refresh timer that fired before close_session does not log in again."""
+        add_login()
+        client = AtomeClient(
+            "test_login", "test_password", "12345", "101234567",
+            session_refresh=True, session_lifetime=1,
+        )
+        client.login()
+        # the timer fired with this generation but gets the lock after close_session
+        generation = client._login_gate.generation
+        client.close_session()
+        client._relogin(generation)
+        time.sleep(0.2)
+        assert client._session is None
+        assert client._refresh_timer is None
+        assert len(responses.calls) == 1
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,66 @@
+"""Module used to test the consumption export."""
+import csv
+import io
+import json
+import unittest
+
+from pykeyatome.consumption_export import (
+    FIELDS,
+    ConsumptionWriter,
+    iter_consumption_rows,
+    write_ndjson,
+)
+
+from .helpers import load_json
+
+
+class ConsumptionExportTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Load the consumption."""
+        self.payload = load_json("3months.json")
+
+    def test_rows(self):
+        """One flat row per day."""
+        rows = list(iter_consumption_rows(self.payload, "101234567"))
+        assert len(rows) == len(self.payload["data"])
+        assert rows[0] == (
+            "101234567",
+            "2022-06-23T00:00:00+02:00",
+            13596,
+            4221,
+            0.742896,
+            "0.17600",
+            9375,
+            1.975125,
+            "0.21068",
+        )
+        assert list(iter_consumption_rows(None)) == []
+
+    def test_csv(self):
+        """The header is written once for several linky."""
+        out = io.StringIO()
+        writer = ConsumptionWriter(out, "csv")
+        count = writer.write(self.payload, "1")
+        writer.write(self.payload, "2")
+        lines = list(csv.reader(io.StringIO(out.getvalue())))
+        assert lines[0] == list(FIELDS)
+        assert len(lines) == 1 + 2 * count
+        assert lines[1][:3] == ["1", "2022-06-23T00:00:00+02:00", "13596"]
+        assert lines[count + 1][0] == "2"
+
+    def test_ndjson(self):
+        """One compact object per line."""
+        out = io.StringIO()
+        count = write_ndjson(iter_consumption_rows(self.payload), out)
+        lines = out.getvalue().splitlines()
+        assert len(lines) == count
+        assert " " not in lines[0]
+        assert json.loads(lines[0])["priceindex2"] == "0.21068"
+        with self.assertRaises(ValueError):
+            ConsumptionWriter(out, "xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Module used to test the metrics exporter."""
+import threading
+import time
+import unittest
+from urllib.request import urlopen
+
+from pykeyatome.exporter import MetricsExporter
+
+from .helpers import FakeClient, load_json
+
+
+class MetricsExporterTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_export(self):
+        """Scrapes are served from memory."""
+        client = FakeClient(load_json("live.json"), load_json("3months.json"))
+        exporter = MetricsExporter(
+            client, port=0, min_interval=60, max_interval=60
+        ).start()
+        try:
+            url = "http://%s:%s/metrics" % exporter.address
+            deadline = time.monotonic() + 5
+            while b"atome_consumption_day_wh" not in exporter.get_page():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            for _ in range(3):
+                with urlopen(url) as response:
+                    page = response.read().decode("utf-8")
+        finally:
+            exporter.stop()
+
+        assert 'atome_up{user_reference="101234567"} 1' in page
+        assert 'atome_live_power_watts{user_reference="101234567"} 2289' in page
+        assert 'atome_live_connected{user_reference="101234567"} 1' in page
+        day_labels = '{user_reference="101234567",day="2022-06-25"}'
+        assert "atome_consumption_day_wh%s 12327" % day_labels in page
+        assert "# TYPE atome_live_filtered_power_watts gauge" in page
+        assert client.live_calls == 1
+        assert client.consumption_calls == 1
+
+    def test_stop_waits_for_polls(self):
+        """stop() returns once the in-flight poll is over."""
+        started = threading.Event()
+        finished = threading.Event()
+
+        class SlowClient(FakeClient):
+            def get_live(self):
+                started.set()
+                # longer than the server shutdown
+                time.sleep(1)
+                finished.set()
+                return super().get_live()
+
+        client = SlowClient(load_json("live.json"), load_json("3months.json"))
+        exporter = MetricsExporter(
+            client, port=0, min_interval=60, max_interval=60
+        ).start()
+        assert started.wait(5)
+        exporter.stop()
+        assert finished.is_set()
+        assert client.live_calls == 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+"""Module used to test the client metrics."""
+import unittest
+
+import responses
+
+from pykeyatome.client import AtomeClient, live_url
+from pykeyatome.metrics import ClientMetrics, Histogram
+
+from .helpers import add_login
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_histogram(self):
+        """Buckets are cumulative."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert histogram.get_dict() == {
+            "count": 4,
+            "sum": 3.65,
+            "buckets": {0.1: 2, 1.0: 3, float("inf"): 4},
+        }
+
+    @responses.activate
+    def test_client_metrics(self):
+        """Requests, relogin, retries, bytes and decode are recorded."""
+        add_login()
+        url = live_url("12345", "101234567")
+        responses.add(responses.GET, url, status=403, body="Wrong session")
+        responses.add(responses.GET, url, body='{"last": 2289}')
+
+        metrics = ClientMetrics()
+        events = []
+        metrics.subscribe(events.append)
+        client = AtomeClient(
+            "test_login", "test_password", "12345", "101234567", metrics=metrics
+        )
+        client.login()
+        assert client.get_live() == {"last": 2289}
+
+        snapshot = metrics.snapshot()
+        live = snapshot["endpoints"]["live"]
+        assert live["requests"] == 2
+        assert live["errors"] == 1
+        assert live["retries"] == 1
+        assert live["bytes_received"] == len("Wrong session") + len('{"last": 2289}')
+        assert live["latency"]["count"] == 2
+        assert live["decode_time"]["count"] == 1
+        assert snapshot["endpoints"]["login"]["requests"] == 2
+        assert snapshot["relogins"] == 1
+        assert snapshot["login_failures"] == 0
+        assert [event["event"] for event in events] == [
+            "login",
+            "request",
+            "relogin",
+            "login",
+            "retry",
+            "request",
+            "decode",
+        ]
+
+        metrics.unsubscribe(events.append)
+        client.get_live()
+        assert len(events) == 7
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+"""Module used to test the retry policy."""
+import unittest
+from unittest import mock
+
+import requests
+import responses
+
+from pykeyatome.breaker import STATE_HALF_OPEN, CircuitBreaker
+from pykeyatome.client import LOGIN_URL, AtomeClient, live_url
+from pykeyatome.retry import (
+    DEADLINE_EXCEEDED,
+    RETRY_CONNECTION,
+    RETRY_FORBIDDEN,
+    RETRY_STATUS,
+    RETRY_TIMEOUT,
+    RetryPolicy,
+)
+
+from .helpers import add_login
+
+URL = live_url("12345", "101234567")
+
+
+class RetryPolicyTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_policy(self):
+        """Backoff grows, is capped and jittered."""
+        policy = RetryPolicy(max_retries=3, backoff_base=1, backoff_max=5, jitter=False)
+        assert [policy.get_delay(RETRY_STATUS, attempt) for attempt in range(4)] == [
+            1,
+            2,
+            4,
+            5,
+        ]
+        assert policy.get_delay(RETRY_FORBIDDEN, 2) == 0
+        assert policy.should_retry(RETRY_TIMEOUT, 2)
+        assert not policy.should_retry(RETRY_TIMEOUT, 3)
+        assert policy.classify_status(503) == RETRY_STATUS
+        assert policy.classify_status(404) is None
+
+        jittered = RetryPolicy(backoff_base=1, backoff_max=5)
+        assert all(0 <= jittered.get_delay(RETRY_STATUS, 3) <= 5 for _ in range(100))
+        assert not RetryPolicy(retry_connection=False).should_retry(RETRY_CONNECTION, 0)
+
+    def _client(self, **kwargs):
+        add_login()
+        client = AtomeClient(
+            "test_login",
+            "test_password",
+            "12345",
+            "101234567",
+            retry_policy=RetryPolicy(**kwargs),
+        )
+        client.login()
+        return client
+
+    @responses.activate
+    @mock.patch("pykeyatome.client.time.sleep")
+    def test_server_error_then_success(self, sleep):
+        """5xx and connection errors are retried with backoff."""
+        client = self._client(backoff_base=1, jitter=False)
+        responses.add(responses.GET, URL, status=502)
+        responses.add(responses.GET, URL, body=requests.ConnectionError("reset"))
+        responses.add(responses.GET, URL, body=requests.exceptions.ReadTimeout("slow"))
+        responses.add(responses.GET, URL, json={"last": 2289})
+        assert client.get_live() == {"last": 2289}
+        assert [call.args[0] for call in sleep.call_args_list] == [1, 2, 4]
+
+    @responses.activate
+    @mock.patch("pykeyatome.client.time.sleep")
+    def test_max_retries(self, sleep):
+        """Give up after max retries."""
+        client = self._client(max_retries=2, jitter=False)
+        responses.add(responses.GET, URL, status=500)
+        assert client.get_live() is None
+        assert len([call for call in responses.calls if call.request.url == URL]) == 3
+
+    @responses.activate
+    def test_deadline(self):
+        """Do not wait past the deadline."""
+        client = self._client(backoff_base=10, jitter=False, deadline=1)
+        responses.add(responses.GET, URL, status=503)
+        with mock.patch("pykeyatome.client.time.sleep") as sleep:
+            assert client.get_live() is None
+        sleep.assert_not_called()
+
+    @responses.activate
+    def test_relogin_within_deadline(self):
+        """The relogin after a 403 is bounded by the call deadline."""
+        client = self._client(deadline=2)
+        responses.add(responses.GET, URL, status=403)
+        responses.add(responses.GET, URL, json={"last": 2289})
+        assert client.get_live() == {"last": 2289}
+        relogin = [call for call in responses.calls if call.request.url == LOGIN_URL][
+            -1
+        ]
+        assert 0 < relogin.request.req_kwargs["timeout"] <= 2
+
+    @responses.activate
+    def test_deadline_exceeded_leaves_breaker(self):
+        """No request sent past the deadline, the breaker is not told anything."""
+        client = self._client(deadline=0)
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        client._circuit_breaker = breaker
+        assert client.get_live() is None
+        assert client._request_once(URL, "live", 0) == (None, DEADLINE_EXCEEDED)
+        assert breaker.get_dict() == {"state": STATE_HALF_OPEN, "failures": 1}
+        # the probe was not spent
+        assert breaker.allow_request()
+        assert [call for call in responses.calls if call.request.url == URL] == []
+
+    def test_default_timeout(self):
+        """A request never waits forever."""
+        client = AtomeClient("test_login", "test_password", "12345", "101234567")
+        assert client._timeout is None
+        assert client._get_timeout() == 10
+
+    @responses.activate
+    def test_connect_read_timeout(self):
+        """A (connect, read) timeout is kept, each part bounded by the deadline."""
+        client = self._client(deadline=5)
+        client._timeout = (3.05, 27)
+        responses.add(responses.GET, URL, json={"last": 2289})
+        assert client.get_live() == {"last": 2289}
+        connect, read = responses.calls[-1].request.req_kwargs["timeout"]
+        assert connect == 3.05
+        assert 0 < read <= 5
+        client._retry_policy = RetryPolicy()
+        assert client._get_timeout() == (3.05, 27)
+
+
+if __name__ == "__main__":
+    unittest.main()
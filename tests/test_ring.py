@@ -0,0 +1,81 @@
+"""Module used to test the ring of live readings."""
+import random
+import unittest
+
+from pykeyatome.ring import LiveRing
+from pykeyatome.watch import LiveWatcher
+
+from .helpers import FakeClient
+
+
+def _reading(moment, last, filtered_power):
+    return {
+        "time": "2022-06-23T10:%02d:%02d+02:00" % (moment // 60, moment % 60),
+        "last": last,
+        "filteredPower": filtered_power,
+    }
+
+
+class LiveRingTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_window_stats(self):
+        """Stats match a recomputation over the samples of each window."""
+        generator = random.Random(1)
+        ring = LiveRing(capacity=50, windows=(30, 300))
+        samples = []
+        moment = 0
+        for _ in range(500):
+            moment += generator.randint(1, 9)
+            last, filtered_power = generator.randint(0, 9000), generator.randint(
+                0, 9000
+            )
+            assert ring.append(
+                {"last": last, "filteredPower": filtered_power}, now=moment
+            )
+            samples = (samples + [(moment, last, filtered_power)])[-50:]
+            for window in (30, 300):
+                kept = [sample for sample in samples if sample[0] > moment - window]
+                stats = ring.get_stats(window)
+                assert stats["count"] == len(kept)
+                assert stats["last"]["sum"] == sum(sample[1] for sample in kept)
+                assert stats["last"]["max"] == max(sample[1] for sample in kept)
+                assert stats["filtered_power"]["min"] == min(
+                    sample[2] for sample in kept
+                )
+        assert len(ring) == 50
+        assert [sample[0] for sample in ring.get_samples()] == [
+            sample[0] for sample in samples
+        ]
+
+    def test_append(self):
+        """Incomplete or older readings are ignored."""
+        ring = LiveRing(windows=(60,))
+        assert ring.get_stats(60)["last"]["mean"] is None
+        assert ring.append(_reading(10, 100, 90))
+        assert not ring.append({"time": "2022-06-23T10:00:20+02:00", "last": 1})
+        assert not ring.append(_reading(5, 1, 1))
+        assert ring.append(_reading(20, 300, 110))
+        stats = ring.get_stats(60)
+        assert stats["count"] == 2
+        assert stats["last"]["mean"] == 200
+        with self.assertRaises(ValueError):
+            ring.get_stats(3600)
+
+    def test_watcher(self):
+        """The watcher keeps each new reading once."""
+        client = FakeClient(
+            [_reading(1, 100, 100), _reading(1, 100, 100), _reading(8, 300, 200)]
+        )
+        ring = LiveRing(windows=(300,))
+        watcher = LiveWatcher(client, 1, 60, count=3, sleep=lambda _: None, ring=ring)
+        assert len(list(watcher)) == 3
+        assert watcher.get_ring() is ring
+        stats = ring.get_stats(300)
+        assert stats["count"] == 2
+        assert stats["last"]["max"] == 300
+        assert stats["filtered_power"]["mean"] == 150
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""Module used to test the rollups."""
+import datetime
+import unittest
+
+from pykeyatome.client import (
+    DAILY_PERIOD_TYPE,
+    MONTHLY_PERIOD_TYPE,
+    WEEKLY_PERIOD_TYPE,
+    YEARLY_PERIOD_TYPE,
+)
+from pykeyatome.rollup import rollup
+from pykeyatome.series import ConsumptionSeries, np
+
+from .helpers import daily_payload
+
+DAY = {
+    "index1": 4,
+    "bill1": 0.5,
+    "priceindex1": "0.12500",
+    "index2": 6,
+    "bill2": 1.0,
+    "priceindex2": "0.16667",
+}
+
+
+class RollupTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def _check(self, use_numpy):
+        # Wednesday 2021-12-29 to Thursday 2022-02-03
+        series = ConsumptionSeries.from_json(
+            daily_payload(datetime.date(2021, 12, 29), 37, DAY), use_numpy=use_numpy
+        )
+
+        daily = rollup(series, DAILY_PERIOD_TYPE)
+        assert len(daily["period"]) == 37
+        assert daily["period"][0] == datetime.date(2021, 12, 29)
+
+        weekly = rollup(series, WEEKLY_PERIOD_TYPE)
+        assert weekly["period"][:2] == [
+            datetime.date(2021, 12, 27),
+            datetime.date(2022, 1, 3),
+        ]
+        assert list(weekly["days"]) == [5, 7, 7, 7, 7, 4]
+
+        monthly = rollup(series, MONTHLY_PERIOD_TYPE)
+        assert monthly["period"] == [
+            datetime.date(2021, 12, 1),
+            datetime.date(2022, 1, 1),
+            datetime.date(2022, 2, 1),
+        ]
+        assert list(monthly["days"]) == [3, 31, 3]
+        assert list(monthly["total_consumption"]) == [30, 310, 30]
+        assert list(monthly["bill2"]) == [3.0, 31.0, 3.0]
+
+        yearly = rollup(series, YEARLY_PERIOD_TYPE)
+        assert yearly["period"] == [
+            datetime.date(2021, 1, 1),
+            datetime.date(2022, 1, 1),
+        ]
+        assert list(yearly["index1"]) == [12, 136]
+
+        with self.assertRaises(ValueError):
+            rollup(series, "decade")
+
+    def test_array_backend(self):
+        """Rollup with array.array columns."""
+        self._check(False)
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_backend(self):
+        """Rollup with numpy columns."""
+        self._check(True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Module used to test the consumption series."""
+import unittest
+
+from pykeyatome.series import ConsumptionSeries, np
+
+from .helpers import load_json
+
+
+class ConsumptionSeriesTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Load the consumption payload."""
+        self.payload = load_json("3months.json")
+
+    def _check(self, series):
+        assert len(series) == 3
+        assert list(series.time) == [1655935200, 1656021600, 1656108000]
+        assert list(series.offset) == [7200] * 3
+        assert list(series.total_consumption) == [13596, 11052, 12327]
+        assert series.index2[2] == 6338
+        assert series.priceindex1[0] == 0.176
+        assert series.to_list() == self.payload["data"]
+
+    def test_array_backend(self):
+        """Parse with array.array columns."""
+        series = ConsumptionSeries.from_json(self.payload, use_numpy=False)
+        assert not series.uses_numpy
+        self._check(series)
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_backend(self):
+        """Parse with numpy columns."""
+        series = ConsumptionSeries.from_json(self.payload, use_numpy=True)
+        assert series.uses_numpy
+        self._check(series)
+        assert series.bill1.sum() == sum(
+            d["consumption"]["bill1"] for d in self.payload["data"]
+        )
+
+    def test_empty(self):
+        """An empty payload gives an empty series."""
+        assert len(ConsumptionSeries.from_json({"data": []})) == 0
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""Module used to test the session store."""
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+import responses
+
+from pykeyatome.client import LOGIN_URL, AtomeClient, live_url
+from pykeyatome.session_store import FileSessionStore
+
+URL = live_url("12345", "101234567")
+
+
+class FileSessionStoreTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Create a store."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "sessions.json")
+        self.store = FileSessionStore(self.path)
+
+    def tearDown(self):
+        """Remove the store."""
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        """Cookies are saved per username, owner only."""
+        assert self.store.load("user") is None
+        self.store.save("user", "S1")
+        self.store.save("other", "S2")
+        assert FileSessionStore(self.path).load("user")[0] == "S1"
+        assert stat.S_IMODE(os.stat(self.path).st_mode) == 0o600
+        self.store.delete("user")
+        assert self.store.load("user") is None
+        assert self.store.load("other")[0] == "S2"
+
+    def _client(self):
+        return AtomeClient(
+            "test_login",
+            "test_password",
+            "12345",
+            "101234567",
+            session_store=self.store,
+        )
+
+    @responses.activate
+    def test_cold_start(self):
+        """A stored session skips login until the server rejects it."""
+        state = {"logins": 0, "valid": None}
+
+        def login_callback(request):
+            state["logins"] += 1
+            state["valid"] = "S%d" % state["logins"]
+            return (200, {"Set-Cookie": "PHPSESSID=%s; path=/" % state["valid"]}, "{}")
+
+        def live_callback(request):
+            if request.headers.get("Cookie") != "PHPSESSID=%s" % state["valid"]:
+                return (403, {}, "Wrong session")
+            return (200, {}, '{"last": 2289}')
+
+        responses.add_callback(responses.POST, LOGIN_URL, callback=login_callback)
+        responses.add_callback(responses.GET, URL, callback=live_callback)
+
+        first = self._client()
+        assert first.login() is not None
+        first.close_session()
+        assert state["logins"] == 1
+        assert self.store.load("test_login")[0] == "S1"
+
+        second = self._client()
+        assert second.login() == {"user_id": "12345", "user_reference": "101234567"}
+        assert second.get_live() == {"last": 2289}
+        assert state["logins"] == 1
+
+        # the server drops the session
+        state["valid"] = "gone"
+        third = self._client()
+        third.login()
+        assert third.get_live() == {"last": 2289}
+        assert state["logins"] == 2
+        assert self.store.load("test_login")[0] == "S2"
+
+
+if __name__ == "__main__":
+    unittest.main()
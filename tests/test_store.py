@@ -0,0 +1,75 @@
+"""Module used to test the consumption store."""
+import copy
+import shutil
+import tempfile
+import unittest
+
+from pykeyatome.store import ConsumptionStore
+
+from .helpers import FakeClient, load_json
+
+
+class ConsumptionStoreTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Create a store directory."""
+        self.directory = tempfile.mkdtemp()
+        self.payload = load_json("3months.json")
+
+    def tearDown(self):
+        """Remove the store directory."""
+        shutil.rmtree(self.directory)
+
+    def test_merge(self):
+        """Payloads are merged by day and persisted."""
+        store = ConsumptionStore(self.directory)
+        assert store.merge("12345", "101234567", self.payload, today="2022-06-25") == 3
+        assert store.get_last_complete_day("12345", "101234567") == "2022-06-24"
+        assert store.merge("12345", "101234567", self.payload, today="2022-06-25") == 0
+
+        newer = copy.deepcopy(self.payload)
+        newer["data"] = newer["data"][1:]
+        newer["data"][-1]["totalConsumption"] = 20000
+        newer["data"].append(dict(newer["data"][-1], time="2022-06-26T00:00:00+02:00"))
+        assert store.merge("12345", "101234567", newer, today="2022-06-27") == 2
+
+        reopened = ConsumptionStore(self.directory)
+        history = reopened.get_history("12345", "101234567")
+        assert [entry["time"][:10] for entry in history] == [
+            "2022-06-23",
+            "2022-06-24",
+            "2022-06-25",
+            "2022-06-26",
+        ]
+        assert history[2]["totalConsumption"] == 20000
+        assert reopened.get_last_complete_day("12345", "101234567") == "2022-06-26"
+        assert (
+            len(
+                reopened.get_history(
+                    "12345", "101234567", start="2022-06-24", end="2022-06-25"
+                )
+            )
+            == 2
+        )
+
+    def test_update_skips_when_up_to_date(self):
+        """No download when yesterday is already stored."""
+        store = ConsumptionStore(self.directory)
+        client = FakeClient(consumption=self.payload)
+        # fixture days are in the past, a download is still due
+        assert store.update(client) == 3
+        assert store.update(client) == 0
+        assert client.consumption_calls == 2
+        assert store.update(client, force=True) == 0
+
+        store.merge("12345", "101234567", self.payload, today="2022-06-26")
+        assert store.is_up_to_date("12345", "101234567", today="2022-06-26")
+        assert not store.is_up_to_date("12345", "101234567", today="2022-06-27")
+        store.is_up_to_date = lambda user_id, user_reference: True
+        assert store.update(client) == 0
+        assert client.consumption_calls == 3
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Module used to test the timestamp parsing."""
+import datetime
+import unittest
+
+from pykeyatome.timestamps import parse_timestamp, parse_timestamps
+
+
+def _reference(value):
+    moment = datetime.datetime.fromisoformat(value)
+    return int(moment.timestamp()), int(moment.utcoffset().total_seconds())
+
+
+class TimestampsTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_same_as_fromisoformat(self):
+        """Fast path and fallback give the same result as fromisoformat."""
+        values = [
+            "2022-06-23T00:00:00+02:00",
+            "2022-10-30T02:30:00+01:00",
+            "2019-08-24T16:19:07+02:00",
+            "1969-12-31T23:59:59-05:30",
+            "2024-02-29T12:00:00+00:00",
+            "2022-06-23T00:00:00.250+02:00",
+            "2022-06-23 00:00:00+02:00",
+        ]
+        for value in values:
+            assert parse_timestamp(value) == _reference(value), value
+        epochs, offsets = parse_timestamps(values)
+        assert list(zip(epochs, offsets)) == [_reference(value) for value in values]
+
+    def test_invalid(self):
+        """Invalid or naive timestamps are rejected."""
+        for value in (
+            "2022-02-30T00:00:00+02:00",
+            "2022-06-23T25:00:00+02:00",
+            "2022-06-23T00:00:00+2:000",
+            "2022-06-23T00:00:00",
+        ):
+            with self.assertRaises(ValueError):
+                parse_timestamp(value)
+
+
+if __name__ == "__main__":
+    unittest.main()
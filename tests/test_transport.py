@@ -0,0 +1,82 @@
+"""Module used to test the pooled transport."""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+import unittest
+
+import requests
+
+from pykeyatome.transport import AtomeTransport
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path == "/slow":
+            # the client gave up, do not answer
+            time.sleep(0.5)
+            self.close_connection = True
+            return
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class AtomeTransportTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def setUp(self):
+        """Start a local keep-alive server."""
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d/" % self.server.server_address[1]
+
+    def tearDown(self):
+        """Stop the server."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        """Sessions of one transport share their connections."""
+        transport = AtomeTransport()
+        first = transport.new_session()
+        second = transport.new_session()
+        for session in (first, second, first):
+            assert session.get(self.url).status_code == 200
+        first.close()
+        assert second.get(self.url).status_code == 200
+
+        assert transport.get_stats() == {
+            "requests": 4,
+            "new_connections": 1,
+            "reused_connections": 3,
+        }
+        transport.close()
+
+    def test_no_keep_alive(self):
+        """Without keep-alive every request opens a connection."""
+        transport = AtomeTransport(keep_alive=False)
+        session = transport.new_session()
+        for _ in range(2):
+            assert session.get(self.url).status_code == 200
+        assert transport.get_stats()["new_connections"] == 2
+        transport.close()
+
+    def test_read_timeout(self):
+        """A read timeout is raised as such, not as a connection error."""
+        transport = AtomeTransport()
+        session = transport.new_session()
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            session.get(self.url + "slow", timeout=0.1)
+        transport.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
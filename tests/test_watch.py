@@ -0,0 +1,85 @@
+"""Module used to test live watching."""
+import unittest
+
+from pykeyatome.watch import (
+    AdaptiveInterval,
+    LiveWatcher,
+    apply_delta,
+    changes,
+    deltas,
+    encode_delta,
+)
+
+from .helpers import FakeClient
+
+
+class LiveWatcherTestCase(unittest.TestCase):
+    """Class used to test."""
+
+    def test_adaptive_interval(self):
+        """Interval follows server updates and backs off when idle."""
+        interval = AdaptiveInterval(min_interval=1, max_interval=60)
+        interval.update(True, now=0)
+        assert interval.update(True, now=10) == 10
+        assert interval.update(False, now=20) == 15
+        assert interval.update(False, now=35) == 22.5
+        # estimate is smoothed: 10 + 0.3 * (40 - 10)
+        assert interval.update(True, now=50) == 19
+        for _ in range(20):
+            interval.update(False)
+        assert interval.interval == 60
+
+    def test_watch(self):
+        """Readings are yielded and errors skipped."""
+        client = FakeClient(
+            [
+                {"time": "t1", "last": 1},
+                None,
+                {"time": "t1", "last": 1},
+                {"time": "t2", "last": 2},
+            ]
+        )
+        sleeps = []
+        watcher = LiveWatcher(client, 1, 60, count=3, sleep=sleeps.append)
+        readings = list(watcher)
+        assert [reading["last"] for reading in readings] == [1, 1, 2]
+        assert len(sleeps) == 3
+        assert client.live == []
+
+
+class ChangesTestCase(unittest.TestCase):
+    """Class used to test change detection."""
+
+    def test_changes(self):
+        """Only changed readings are emitted."""
+        readings = [
+            {"time": "t1", "last": 1, "filteredPower": 5, "isConnected": True},
+            {"time": "t2", "last": 1, "filteredPower": 5, "isConnected": True},
+            {"time": "t3", "last": 1, "filteredPower": 6, "isConnected": True},
+            {"time": "t4", "last": 1, "filteredPower": 6, "isConnected": False},
+        ]
+        assert [reading["time"] for reading in changes(readings)] == ["t1", "t3", "t4"]
+
+    def test_delta_round_trip(self):
+        """Deltas hold changed fields and rebuild the stream."""
+        readings = [
+            {"time": "t1", "last": 1, "isConnected": True},
+            {"time": "t2", "last": 1, "isConnected": True},
+            {"time": "t3", "last": 2},
+        ]
+        encoded = list(deltas(readings))
+        assert encoded == [
+            readings[0],
+            {"time": "t2"},
+            {"time": "t3", "last": 2, "-": ["isConnected"]},
+        ]
+        assert encode_delta(readings[0], readings[0]) == {}
+
+        previous = None
+        for reading, delta in zip(readings, encoded):
+            previous = apply_delta(previous, delta)
+            assert previous == reading
+
+
+if __name__ == "__main__":
+    unittest.main()